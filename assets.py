@@ -0,0 +1,106 @@
+#! /usr/bin/env python3
+
+'''
+Resource loading for the memoz game. Pictures, fonts and sounds are read into
+memory and handed to pygame as file-like objects, whether the game runs from
+its source tree or from the single-file bundle made by build.py. In the latter
+case the whole archive is read once, sequentially, and every resource is then
+taken from that copy instead of being opened on its own.
+Paths given to this module are the ones defined in config.py.
+date: October 2026
+'''
+
+import io
+import os
+import zipfile
+import zipimport
+from functools import lru_cache
+
+import pygame
+
+import config
+
+_archive = None
+_provider = None
+
+
+def _bundle():
+    '''
+    Return the path of the archive the game runs from, or None when it runs
+    from its source tree.
+    '''
+    loader = getattr(config, '__loader__', None)
+    if isinstance(loader, zipimport.zipimporter):
+        return loader.archive
+    return None
+
+
+def _open_archive(path):
+    '''
+    Read the archive at path in one go and return it as a ZipFile over the
+    copy in memory.
+    '''
+    global _archive
+    if _archive is None:
+        with open(path, 'rb') as archive_file:
+            _archive = zipfile.ZipFile(io.BytesIO(archive_file.read()))
+    return _archive
+
+
+@lru_cache(maxsize=None)
+def read(path):
+    '''
+    Return the content of the resource at path as bytes.
+    '''
+    bundle = _bundle()
+    if bundle is None:
+        with open(path, 'rb') as resource:
+            return resource.read()
+    member = os.path.relpath(path, bundle).replace(os.sep, '/')
+    return _open_archive(bundle).read(member)
+
+
+def install(provider):
+    '''
+    Have resources taken from provider, when it has them, rather than read
+    and decoded. provider is expected to implement image(path), sound(path)
+    and font(path, size), each returning None for resources it doesn't hold.
+    '''
+    global _provider
+    _provider = provider
+
+
+def load(path):
+    '''
+    Return a new file-like object over the content of the resource at path.
+    '''
+    return io.BytesIO(read(path))
+
+
+def image(path):
+    if _provider is not None:
+        img = _provider.image(path)
+        if img is not None:
+            return img
+    return pygame.image.load(load(path), os.path.basename(path))
+
+
+def font(path, size):
+    '''
+    Return a Font from the file at path. None gives pygame's default font.
+    '''
+    if path is None:
+        return pygame.font.Font(None, size)
+    if _provider is not None:
+        typeface = _provider.font(path, size)
+        if typeface is not None:
+            return typeface
+    return pygame.font.Font(load(path), size)
+
+
+def sound(path):
+    if _provider is not None:
+        decoded = _provider.sound(path)
+        if decoded is not None:
+            return decoded
+    return pygame.mixer.Sound(file=load(path))
@@ -0,0 +1,103 @@
+#! /usr/bin/env python3
+
+'''
+Build a single-file executable of the memoz game. The archive, a zipapp,
+holds the bytecode of the game's modules, those main.py imports directly or
+not, and every resource. Once built, the archive is checked by importing main
+from it. It can be run with the Python version that built it:
+    python3 build.py
+    python3 dist/memoz.pyz
+date: October 2026
+'''
+
+import argparse
+import modulefinder
+import os
+import py_compile
+import stat
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY = 'main'
+RESOURCES = ('Comic_Sans_MS.ttf', 'LeagueSpartan-Bold.otf', 'click_bad.ogg',
+             'click_menu.ogg', 'click_ok.ogg', 'hidden-tile.png', 'icon.png',
+             'right-tile.png', 'wrong-tile.png')
+# these formats are already compressed
+STORED = ('.png', '.ogg')
+MAIN = 'import main\nmain.cli()\n'
+INTERPRETER = '/usr/bin/env python3'
+
+
+def game_modules(entry=ENTRY):
+    '''
+    Return the names of the modules of the game, entry and the modules of
+    this directory it imports, directly or not. Development tools aren't
+    imported by the game and therefore aren't bundled.
+    '''
+    finder = modulefinder.ModuleFinder(path=[ROOT])
+    finder.run_script(os.path.join(ROOT, entry + '.py'))
+    names = {entry}
+    names.update(name for name, module in finder.modules.items()
+                 if name != '__main__' and module.__file__)
+    return tuple(sorted(names))
+
+
+def check(target, entry=ENTRY):
+    '''
+    Raise a RuntimeError if entry can't be imported from the archive target
+    by an interpreter that doesn't see this directory.
+    '''
+    script = 'import sys; sys.path.insert(0, sys.argv[1]); import {}'.format(entry)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy')
+        env.pop('PYTHONPATH', None)
+        result = subprocess.run([sys.executable, '-c', script, os.path.abspath(target)],
+                                cwd=tmp, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError('{} is broken:\n{}'.format(target, result.stderr))
+
+
+def build(target, interpreter=INTERPRETER, optimize=-1):
+    '''
+    Write the archive to target. Modules are compiled with the given
+    optimization level, as for compile().
+    '''
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    with open(target, 'wb') as archive_file:
+        archive_file.write('#!{}\n'.format(interpreter).encode('utf-8'))
+        with zipfile.ZipFile(archive_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+            with tempfile.TemporaryDirectory() as tmp:
+                for name in game_modules() + ('__main__',):
+                    source = os.path.join(tmp, name + '.py')
+                    if name == '__main__':
+                        with open(source, 'w') as main_file:
+                            main_file.write(MAIN)
+                    else:
+                        source = os.path.join(ROOT, name + '.py')
+                    cfile = os.path.join(tmp, name + '.pyc')
+                    # bundled bytecode has no source to be checked against
+                    py_compile.compile(source, cfile, dfile=name + '.py', doraise=True,
+                                       optimize=optimize,
+                                       invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+                    archive.write(cfile, name + '.pyc')
+            for name in RESOURCES:
+                compression = (zipfile.ZIP_STORED if name.endswith(STORED)
+                               else zipfile.ZIP_DEFLATED)
+                archive.write(os.path.join(ROOT, 'resources', name),
+                              'resources/' + name, compress_type=compression)
+    mode = os.stat(target).st_mode
+    os.chmod(target, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build a single-file memoz.')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'dist', 'memoz.pyz'))
+    parser.add_argument('--python', default=INTERPRETER,
+                        help='interpreter of the shebang line')
+    args = parser.parse_args()
+    build(args.output, args.python)
+    check(args.output)
+    print('built {} ({} bytes)'.format(args.output, os.path.getsize(args.output)))
@@ -0,0 +1,227 @@
+#! /usr/bin/env python3
+
+'''
+Session recording for the memoz game. A FrameRecorder is registered as an
+observer of a Stage: once the display has been updated, the pixels of the
+screen are copied, straight from the Surface's buffer, into one of a few
+preallocated buffers and handed to a worker thread that writes them to disk.
+When the worker falls behind and no buffer is free, frames are dropped rather
+than making the game wait.
+Frames can be written as numbered PNG pictures, as a raw RGB24 stream or as a
+YUV4MPEG2 stream (the latter needs NumPy). To record a session, type:
+    python3 main.py --record session.y4m --record-format y4m
+date: October 2026
+'''
+
+import os
+import queue
+import sys
+import threading
+
+
+class FrameRecorder:
+    '''
+    Stage observer that records the screen. Formats are:
+        - PNG: path is a directory where numbered PNG pictures are written
+        - RAW: path is a file that receives every frame as raw RGB24 pixels
+        - Y4M: path is a YUV4MPEG2 file (4:4:4 sampling)
+    One frame out of 'every' is recorded. buffers is the number of frames
+    that can be waiting for the worker before frames get dropped.
+    '''
+
+    PNG = 'png'
+    RAW = 'raw'
+    Y4M = 'y4m'
+    FORMATS = (PNG, RAW, Y4M)
+
+    def __init__(self, path, fmt=PNG, fps=None, every=1, buffers=4):
+        if fmt not in self.FORMATS:
+            raise ValueError('unknown format: {}'.format(fmt))
+        if fmt == self.Y4M:
+            import numpy    # fail now rather than in the worker
+        self._path = path
+        self._format = fmt
+        self._fps = fps
+        self._every = every
+        self._nb_buffers = buffers
+        self._free = None       # buffers the frame thread can fill
+        self._pending = None    # filled buffers waiting for the worker
+        self._worker = None
+        self._size = None
+        self._masks = None
+        self._error = None
+        self._count = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+
+    # Stage observer interface
+
+    def frame_begin(self, stage):
+        pass
+
+    def frame_end(self, stage):
+        self._count += 1
+        if self._count % self._every:
+            return
+        screen = stage.screen
+        if self._worker is None:
+            self.start(screen)
+        try:
+            buf = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        view = screen.get_view('0')
+        memoryview(buf)[:] = memoryview(view).cast('B')
+        # the screen is locked as long as a view of its pixels exists
+        del view
+        self._pending.put_nowait((self.captured, buf))
+        self.captured += 1
+
+    # Own functionnalities
+
+    def start(self, screen):
+        '''
+        Allocate buffers matching screen and start the worker thread. It is
+        done by the first frame if it wasn't called before.
+        '''
+        if screen.get_bytesize() != 4:
+            raise ValueError('32 bits display expected')
+        self._size = screen.get_size()
+        self._masks = screen.get_masks()
+        nb_bytes = self._size[0] * self._size[1] * 4
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        for _ in range(self._nb_buffers):
+            self._free.put(bytearray(nb_bytes))
+        self._worker = threading.Thread(target=self._work, name='frame recorder',
+                                        daemon=True)
+        self._worker.start()
+
+    def close(self):
+        '''
+        Wait for the frames already captured to be written and stop the
+        worker. The worker's error, if any, is raised again here.
+        '''
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker.join()
+            self._worker = None
+        if self._error is not None:
+            raise self._error
+
+    def report(self):
+        return '{} frames captured, {} written, {} dropped'.format(
+            self.captured, self.written, self.dropped)
+
+    def _work(self):
+        writer = None
+        try:
+            writer = self._open_writer()
+            while True:
+                item = self._pending.get()
+                if item is None:
+                    break
+                index, buf = item
+                writer(index, buf)
+                self.written += 1
+                self._free.put(buf)
+        except Exception as error:
+            # the frame thread never waits for the worker, so it stops
+            # capturing by never getting a free buffer again
+            self._error = error
+        finally:
+            if hasattr(writer, 'close'):
+                writer.close()
+
+    def _open_writer(self):
+        if self._format == self.PNG:
+            os.makedirs(self._path, exist_ok=True)
+            return PNGWriter(self._path, self._size, self._masks)
+        elif self._format == self.RAW:
+            return RawWriter(self._path, self._size, self._masks)
+        return Y4MWriter(self._path, self._size, self._masks, self._fps)
+
+
+def byte_offsets(masks):
+    '''
+    Return the offsets of the red, green and blue bytes within a 32 bits
+    pixel with the given colour masks.
+    '''
+    offsets = []
+    for mask in masks[:3]:
+        shift = (mask & -mask).bit_length() - 1
+        offset = shift // 8
+        if sys.byteorder == 'big':
+            offset = 3 - offset
+        offsets.append(offset)
+    return offsets
+
+
+class PNGWriter:
+    '''
+    Write every frame to a numbered PNG picture.
+    '''
+
+    def __init__(self, directory, size, masks):
+        import pygame
+        self._directory = directory
+        self._surface = pygame.Surface(size, 0, 32, masks)
+
+    def __call__(self, index, buf):
+        import pygame
+        view = self._surface.get_view('0')
+        memoryview(view).cast('B')[:] = buf
+        del view
+        pygame.image.save(self._surface, os.path.join(self._directory,
+                                                      'frame{:06d}.png'.format(index)))
+
+
+class RawWriter:
+    '''
+    Append every frame, as RGB24 pixels, to a file.
+    '''
+
+    def __init__(self, path, size, masks):
+        self._file = open(path, 'wb')
+        self._offsets = byte_offsets(masks)
+        self._rgb = bytearray(size[0] * size[1] * 3)
+
+    def __call__(self, index, buf):
+        for channel, offset in enumerate(self._offsets):
+            self._rgb[channel::3] = buf[offset::4]
+        self._file.write(self._rgb)
+
+    def close(self):
+        self._file.close()
+
+
+class Y4MWriter:
+    '''
+    Write frames to a YUV4MPEG2 stream, converting them to BT.601 YCbCr.
+    '''
+
+    def __init__(self, path, size, masks, fps):
+        import numpy
+        self._numpy = numpy
+        self._size = size
+        self._offsets = byte_offsets(masks)
+        self._file = open(path, 'wb')
+        self._file.write('YUV4MPEG2 W{} H{} F{}:1 Ip A1:1 C444\n'.format(
+            size[0], size[1], fps or 40).encode('ascii'))
+
+    def __call__(self, index, buf):
+        np = self._numpy
+        pixels = np.frombuffer(buf, np.uint8).reshape(self._size[1], self._size[0], 4)
+        red, green, blue = (pixels[:, :, offset].astype(np.float32)
+                            for offset in self._offsets)
+        luma = 16 + 0.257*red + 0.504*green + 0.098*blue
+        blue_diff = 128 - 0.148*red - 0.291*green + 0.439*blue
+        red_diff = 128 + 0.439*red - 0.368*green - 0.071*blue
+        self._file.write(b'FRAME\n')
+        for plane in (luma, blue_diff, red_diff):
+            self._file.write(np.clip(np.rint(plane), 0, 255).astype(np.uint8).tobytes())
+
+    def close(self):
+        self._file.close()
@@ -35,6 +35,22 @@ SOUND_BAD = os.path.join(RESOURCES, 'click_bad.ogg')
 SOUND_MENU = os.path.join(RESOURCES, 'click_menu.ogg')
 ICON = os.path.join(RESOURCES, 'icon.png')
 
+# tiles, when TILE_THEME is the name of one of themes.THEMES tile pictures are
+# drawn TILE_SIDE pixels wide instead of being loaded (needs NumPy)
+TILE_THEME = None
+TILE_SIDE = 40
+
+# sound output
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_BUFFER = 512
+
+# telemetry, events are sent to TELEMETRY_ENDPOINT (http://host:port/path or
+# unix:/path/to/socket) when it isn't None, batches that can't be sent are
+# appended to TELEMETRY_FALLBACK
+TELEMETRY_ENDPOINT = None
+TELEMETRY_FALLBACK = 'telemetry.jsonl.gz'
+
 # font sizes
 FONT_SIZE_1 = 72
 FONT_SIZE_2 = 46
@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+
+'''
+Golden-image render verification for the memoz game. Every Scene is brought,
+under SDL's dummy drivers, to a known state and the screen's pixels are
+hashed straight from the display Surface's buffer. Hashes are compared to the
+ones stored in golden/hashes.json. When a hash doesn't match, an image showing
+the differing pixels in red is written to golden/diff/.
+Renderings depend on the versions of pygame and FreeType, golden hashes need
+to be updated when those change. To check renderings, type:
+    python3 golden.py
+To store the current renderings as the golden ones, type:
+    python3 golden.py --update
+date: October 2026
+'''
+
+import hashlib
+import json
+import os
+import random
+import sys
+from config import COLOR_BLACK
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+GOLDEN_HASHES = os.path.join(GOLDEN_DIR, 'hashes.json')
+DIFF_DIR = os.path.join(GOLDEN_DIR, 'diff')
+SEED = 2020                     # seed of the fixed board
+COLOR_DIFF = (255, 0, 0)
+
+
+def frame_hash(surface):
+    '''
+    Return a hash of the size and pixels of surface. Pixels are read from
+    the Surface's buffer without being copied or encoded.
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('{}x{}'.format(*surface.get_size()).encode('ascii'))
+    view = surface.get_view('0')
+    digest.update(view)
+    del view
+    return digest.hexdigest()
+
+
+def scenarios(stage):
+    '''
+    Bring stage to every state to verify, yielding the name of each state
+    once it is onscreen.
+    '''
+    from memoz import GameScene, PauseMenu
+    stage.run_deferred()
+    for name in (stage.MAIN, 'credits', 'difficulty'):
+        stage.target = name
+        stage.step()
+        yield name
+    random.seed(SEED)
+    stage.target = GameScene.NAME
+    stage.step()
+    yield 'game revealed'
+    # memorisation time, then the wave hiding the tiles
+    game = stage[GameScene.NAME]
+    while game.grid.tiles[0][0].revealed or any(tile.animated for row in game.grid.tiles
+                                               for tile in row):
+        stage.step()
+    yield 'game hidden'
+    stage.push(PauseMenu.NAME, GameScene.PAUSE_DIM)
+    stage.step()
+    yield 'game paused'
+
+
+def diff_image(current, golden):
+    '''
+    Return a Surface where pixels that differ between current and golden
+    are red, other pixels being a dimmed version of current.
+    '''
+    import pygame
+    diff = current.copy()
+    diff.fill((96, 96, 96), special_flags=pygame.BLEND_MULT)
+    if golden.get_size() != current.get_size():
+        diff.fill(COLOR_DIFF)
+        return diff
+    # compare() paints matching pixels white and the others black, it needs
+    # both pictures to have the same pixel format
+    golden = golden.convert(current)
+    changed = pygame.PixelArray(current).compare(pygame.PixelArray(golden)).make_surface()
+    mask = pygame.mask.from_threshold(changed, COLOR_BLACK, (1, 1, 1, 255))
+    diff.blit(mask.to_surface(setcolor=COLOR_DIFF, unsetcolor=None), (0, 0))
+    return diff
+
+
+def filename(name):
+    return name.replace(' ', '-') + '.png'
+
+
+def verify(update=False):
+    '''
+    Compare the renderings of every scenario with the golden ones, or store
+    them if update is True. Return the names of the scenarios that don't
+    match.
+    '''
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    import main
+    golden = {}
+    if not update:
+        with open(GOLDEN_HASHES) as hashes:
+            golden = json.load(hashes)
+    stage = main.build_stage(fps=0)
+    hashes = {}
+    mismatches = []
+    try:
+        for name in scenarios(stage):
+            hashes[name] = frame_hash(stage.screen)
+            if update:
+                # golden pictures are only needed to draw diff images
+                os.makedirs(GOLDEN_DIR, exist_ok=True)
+                pygame.image.save(stage.screen, os.path.join(GOLDEN_DIR, filename(name)))
+            elif hashes[name] != golden.get(name):
+                mismatches.append(name)
+                golden_path = os.path.join(GOLDEN_DIR, filename(name))
+                os.makedirs(DIFF_DIR, exist_ok=True)
+                if os.path.exists(golden_path):
+                    diff = diff_image(stage.screen, pygame.image.load(golden_path))
+                    pygame.image.save(diff, os.path.join(DIFF_DIR, filename(name)))
+                pygame.image.save(stage.screen,
+                                  os.path.join(DIFF_DIR, 'current-' + filename(name)))
+    finally:
+        stage.quit()
+    if update:
+        with open(GOLDEN_HASHES, 'w') as golden_file:
+            json.dump(hashes, golden_file, indent=4, sort_keys=True)
+            golden_file.write('\n')
+    return mismatches
+
+
+if __name__ == '__main__':
+    update = '--update' in sys.argv[1:]
+    mismatches = verify(update)
+    if update:
+        print('golden renderings updated')
+    elif mismatches:
+        sys.exit('renderings differ for: {} (see {})'.format(', '.join(mismatches),
+                                                          DIFF_DIR))
+    else:
+        print('renderings match')
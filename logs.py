@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+
+'''
+Logging for the memoz game. Modules log through the standard logging module,
+using loggers named after them. setup() routes every record through a queue
+to a listener thread that formats and writes it, so the frame loop never
+waits for a slow console or file. Records are formatted by the listener, the
+arguments of a record must therefore not change once it has been logged.
+Levels can be set per module with a spec such as 'INFO,memoz=DEBUG', the first
+level without a name being the one of every module. For instance, to see the
+boards of every level, run:
+    python3 main.py --log memoz=DEBUG
+date: October 2026
+'''
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+FORMAT = '%(asctime)s %(threadName)s %(name)s %(levelname)s: %(message)s'
+DEFAULT_LEVEL = logging.WARNING
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    '''
+    QueueHandler leaving the formatting of records to the listener's thread.
+    '''
+
+    def prepare(self, record):
+        return record
+
+
+def parse_levels(spec):
+    '''
+    Turn a spec such as 'INFO,memoz=DEBUG' into a dict mapping logger names
+    to levels, the root logger's name being ''.
+    '''
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = item.rpartition('=')
+        if not isinstance(logging.getLevelName(level.upper()), int):
+            raise ValueError('unknown logging level: {}'.format(level))
+        levels[name] = level.upper()
+    return levels
+
+
+def set_levels(levels):
+    '''
+    Set the level of every logger in levels, a dict mapping logger names to
+    levels.
+    '''
+    for name, level in levels.items():
+        logging.getLogger(name or None).setLevel(level)
+
+
+def setup(spec='', stream=None, filename=None):
+    '''
+    Route logging through a queue to a listener thread writing records to
+    filename, or to stream (stderr by default), and set levels from spec.
+    Calling setup again only changes levels.
+    '''
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(DEFAULT_LEVEL)
+    set_levels(parse_levels(spec))
+    if _listener is not None:
+        return _listener
+    if filename:
+        handler = logging.FileHandler(filename)
+    else:
+        handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(FORMAT))
+    records = queue.SimpleQueue()
+    root.addHandler(DeferredQueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, handler,
+                                               respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+    return _listener
+
+
+def shutdown():
+    '''
+    Write pending records and stop the listener thread.
+    '''
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -6,15 +6,26 @@ about the rules, see the memoz.py module.
 '''
 
 import pygame
-from config import *
+import assets
+import logs
+import telemetry
+from config import (FPS, ICON, MIXER_BUFFER, MIXER_FREQUENCY, MIXER_SIZE,
+                    STAGE_SIZE, TELEMETRY_ENDPOINT, TELEMETRY_FALLBACK)
 from utils import Stage
-from memoz import *
+from memoz import GameScene, MemozMenu, PauseMenu, Tile, init_sounds
 
-def game():
-    pygame.mixer.pre_init(44100, size=-16, buffer=512)
-    icon = pygame.image.load(ICON)
+def build_stage(fps=FPS, display=0):
+    '''
+    Create the Stage and the main menu without starting the main loop. The
+    Stage is returned ready to be played. Other Scenes and resources aren't
+    needed by the first frame, their creation is deferred to the following
+    frames. A fps of 0 lets the Stage run as fast as possible, which is what
+    tools driving the game want. display is the screen the window opens on.
+    '''
+    pygame.mixer.pre_init(MIXER_FREQUENCY, size=MIXER_SIZE, buffer=MIXER_BUFFER)
+    icon = assets.image(ICON)
     pygame.display.set_icon(icon)
-    stage = Stage(STAGE_SIZE, FPS)
+    stage = Stage(STAGE_SIZE, fps, display)
     pygame.display.set_caption('Memoz')
 
 
@@ -28,33 +39,88 @@ def game():
     # main menu instanciation
     main_menu = MemozMenu(stage, 'Memoz', Stage.MAIN, nav=nav)
 
-    # credits instanciation
-    nav = (('Back', stage.nav_link(Stage.MAIN)), )
-    menu_msg = 'Everything by:\nNoé Calbrix & Louison Calbrix'
-    credits = MemozMenu(stage, 'Credits', 'credits', msg=menu_msg, nav=nav)
+    # load sound files
+    stage.defer(init_sounds)
 
     # GameScene instanciation
-    game = GameScene(stage)
+    stage.defer(lambda : GameScene(stage))
+
+    # pause menu, played over the game
+    stage.defer(lambda : PauseMenu(stage))
+
+    # credits instanciation
+    def create_credits():
+        nav = (('Back', stage.nav_link(Stage.MAIN)), )
+        menu_msg = 'Everything by:\nNoé Calbrix & Louison Calbrix'
+        MemozMenu(stage, 'Credits', 'credits', msg=menu_msg, nav=nav)
+    stage.defer(create_credits)
 
     # difficulty screen
-    def change_difficulty(difficulty):
-        game.difficulty = difficulty
-        stage.nav_link(Stage.MAIN)()
-    nav = (
-        ('Easy', lambda : change_difficulty(GameScene.EASY)),
-        ('Medium', lambda : change_difficulty(GameScene.MEDIUM)),
-        ('Hard', lambda : change_difficulty(GameScene.HARD)),
-        ('Back', stage.nav_link(Stage.MAIN))
-    )
-    menu_msg = 'Choose the difficulty'
-    difficulty_menu = MemozMenu(stage, 'Difficulty', 'difficulty', 
-                                msg=menu_msg, nav=nav)
+    def create_difficulty():
+        def change_difficulty(difficulty):
+            stage[GameScene.NAME].difficulty = difficulty
+            stage.nav_link(Stage.MAIN)()
+        nav = (
+            ('Easy', lambda : change_difficulty(GameScene.EASY)),
+            ('Medium', lambda : change_difficulty(GameScene.MEDIUM)),
+            ('Hard', lambda : change_difficulty(GameScene.HARD)),
+            ('Endless', lambda : change_difficulty(GameScene.ENDLESS)),
+            ('Back', stage.nav_link(Stage.MAIN))
+        )
+        menu_msg = 'Choose the difficulty'
+        MemozMenu(stage, 'Difficulty', 'difficulty', msg=menu_msg, nav=nav)
+    stage.defer(create_difficulty)
 
-    # load sound files
-    init_sounds()
+    # decode tile pictures
+    stage.defer(Tile.load_images)
+
+    return stage
+
+def game(record=None, record_format='png', log='', display=0,
+         telemetry_endpoint=TELEMETRY_ENDPOINT):
+    '''
+    Play the game. If record is given, the session is recorded there, see the
+    capture module for available formats. log sets logging levels, see the
+    logs module. display is the screen the window opens on. Events are sent
+    to telemetry_endpoint when it is given, see the telemetry module.
+    '''
+    logs.setup(log)
+    stage = build_stage(display=display)
+    if telemetry_endpoint:
+        telemetry.start(telemetry_endpoint, TELEMETRY_FALLBACK)
+        stage.add_observer(telemetry.FrameStats(FPS))
+    recorder = None
+    if record:
+        from capture import FrameRecorder
+        recorder = FrameRecorder(record, record_format, fps=FPS)
+        stage.add_observer(recorder)
+    try:
+        stage.play()
+    finally:
+        telemetry.stop()
+        if recorder:
+            recorder.close()
+            print(recorder.report())
 
-    # play
-    stage.play()
+def cli(argv=None):
+    '''
+    Parse command line arguments and play the game.
+    '''
+    import argparse
+    parser = argparse.ArgumentParser(description='Memoz, a short-term memory game.')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record the session to PATH')
+    parser.add_argument('--record-format', choices=('png', 'raw', 'y4m'),
+                        default='png', help='format of the recording (default: png)')
+    parser.add_argument('--log', metavar='LEVELS', default='',
+                        help="logging levels, e.g. 'INFO,memoz=DEBUG'")
+    parser.add_argument('--display', type=int, default=0,
+                        help='number of the screen to open the window on')
+    parser.add_argument('--telemetry', metavar='ENDPOINT', default=TELEMETRY_ENDPOINT,
+                        help='send events to ENDPOINT, http://host:port/path '
+                             'or unix:/path/to/socket')
+    args = parser.parse_args(argv)
+    game(args.record, args.record_format, args.log, args.display, args.telemetry)
 
 if __name__ == '__main__':
-    game()
+    cli()
@@ -11,13 +11,20 @@ unlimited tries he must choose wisely!
 date: November 2019
 '''
 
+import logging
 import pygame
+import assets
+import telemetry
 import utils
+from collections import OrderedDict
+from math import ceil
 from random import sample
 from config import *
 
 MARGIN_TILE = 10
 
+logger = logging.getLogger(__name__)
+
 class Tile:
     '''
     A Tile is a square that is either a target or not. The player must memorise
@@ -26,17 +33,17 @@ class Tile:
     and a non target one, when _revealed is False all the Tiles look the same.
     '''
 
-    IMG_HIDDEN = pygame.image.load(PATH_TILE_HIDDEN)
-    IMG_TARGET = pygame.image.load(PATH_TILE_TARGET)
-    IMG_WRONG = pygame.image.load(PATH_TILE_WRONG)
-    # raise error if all three images are not the same size
-    if (IMG_HIDDEN.get_size() != IMG_TARGET.get_size() or
-        IMG_TARGET.get_size() != IMG_WRONG.get_size()):
-        raise ValueError('Images used should be the same size (pixel-wise)')
-    # raise error if images are not square
-    if IMG_HIDDEN.get_width() != IMG_HIDDEN.get_height():
-        raise ValueError('Square images expected')
-    SIDE_TILE = IMG_HIDDEN.get_width()
+    # pictures are loaded by load_images, when first needed
+    IMG_HIDDEN = None
+    IMG_TARGET = None
+    IMG_WRONG = None
+    SIDE_TILE = None
+
+    # flip animations, their frames are computed once and cached
+    SQUASH = 'squash'             # picture squashed then unfolded horizontally
+    FADE = 'fade'                 # cross-fade between both pictures
+    ANIMATION_FRAMES = 10
+    _animation_cache = {}
 
 
     def __init__(self, target, revealed):
@@ -46,20 +53,148 @@ class Tile:
         '''
         self._target = target
         self._revealed = revealed
+        self._frames = None       # frames of the animation being played
+        self._frame = 0           # index of the next frame, negative if delayed
+        self._start_img = None    # picture shown until a delayed animation starts
+
+    @classmethod
+    def load_images(cls):
+        '''
+        Load the pictures of the tiles if they aren't loaded yet. If a
+        TILE_THEME is set, pictures are drawn by the themes module instead.
+        '''
+        if cls.IMG_HIDDEN is not None:
+            return
+        if TILE_THEME:
+            import themes
+            img_hidden, img_target, img_wrong = themes.tile_images(TILE_SIDE, TILE_THEME)
+        else:
+            img_hidden = assets.image(PATH_TILE_HIDDEN)
+            img_target = assets.image(PATH_TILE_TARGET)
+            img_wrong = assets.image(PATH_TILE_WRONG)
+        # raise error if all three images are not the same size
+        if (img_hidden.get_size() != img_target.get_size() or
+            img_target.get_size() != img_wrong.get_size()):
+            raise ValueError('Images used should be the same size (pixel-wise)')
+        # raise error if images are not square
+        if img_hidden.get_width() != img_hidden.get_height():
+            raise ValueError('Square images expected')
+        cls.IMG_HIDDEN = img_hidden
+        cls.IMG_TARGET = img_target
+        cls.IMG_WRONG = img_wrong
+        cls.SIDE_TILE = img_hidden.get_width()
 
     def draw_at(self, display_surface, window_coordinates):
         '''
         Choose the right picture to display and draw it on the display_surface
-        at specified window_coordinates.
+        at specified window_coordinates. When an animation is being played,
+        its next frame is drawn instead.
+        '''
+        if self._frames is None:
+            display_img = self.img
+        else:
+            display_img = self._next_frame()
+        display_surface.blit(display_img, window_coordinates)
+
+    def animate(self, kind, start_img, delay=0):
+        '''
+        Play an animation going from start_img to the current picture of the
+        tile, once delay frames have been drawn.
+        '''
+        self._frames = self.animation_frames(kind, start_img, self.img)
+        self._frame = -delay
+        self._start_img = start_img
+
+    def _next_frame(self):
+        frame = self._frame
+        self._frame += 1
+        if frame < 0:
+            return self._start_img
+        if frame >= len(self._frames):
+            self._frames = None
+            self._start_img = None
+            return self.img
+        return self._frames[frame]
+
+    @property
+    def animated(self):
+        return self._frames is not None
+
+    @classmethod
+    def animation_frames(cls, kind, start_img, end_img, side=None):
+        '''
+        Return the list of Surfaces, side pixels wide, of an animation going
+        from start_img to end_img. Frames are only computed the first time
+        they are asked for.
+        '''
+        if side is None:
+            side = cls.SIDE_TILE
+        key = (kind, start_img, end_img, side)
+        frames = cls._animation_cache.get(key)
+        if frames is None:
+            if start_img.get_width() != side:
+                start_img = pygame.transform.smoothscale(start_img, (side, side))
+            if end_img.get_width() != side:
+                end_img = pygame.transform.smoothscale(end_img, (side, side))
+            if kind == cls.SQUASH:
+                frames = cls._squash_frames(start_img, end_img, side)
+            elif kind == cls.FADE:
+                frames = cls._fade_frames(start_img, end_img, side)
+            else:
+                raise ValueError('unknown animation: {}'.format(kind))
+            cls._animation_cache[key] = frames
+        return frames
+
+    @classmethod
+    def _squash_frames(cls, start_img, end_img, side):
+        '''
+        The start picture gets thinner until it vanishes, then the end
+        picture gets wider until it has its real width, like a card flipping.
+        '''
+        frames = []
+        for k in range(1, cls.ANIMATION_FRAMES + 1):
+            progress = k / cls.ANIMATION_FRAMES
+            if progress < 0.5:
+                img, width = start_img, side * (1 - 2*progress)
+            else:
+                img, width = end_img, side * (2*progress - 1)
+            width = max(1, round(width))
+            frame = pygame.Surface((side, side), pygame.SRCALPHA)
+            frame.blit(pygame.transform.smoothscale(img, (width, side)),
+                       ((side - width) // 2, 0))
+            frames.append(frame)
+        return frames
+
+    @classmethod
+    def _fade_frames(cls, start_img, end_img, side):
+        '''
+        The start picture fades out while the end picture fades in.
+        '''
+        start_img = start_img.convert_alpha(start_img)
+        end_img = end_img.convert_alpha(end_img)
+        frames = []
+        for k in range(1, cls.ANIMATION_FRAMES + 1):
+            alpha = round(255 * k / cls.ANIMATION_FRAMES)
+            frame = pygame.Surface((side, side), pygame.SRCALPHA)
+            start_img.set_alpha(255 - alpha)
+            frame.blit(start_img, COORD_UP_LEFT)
+            end_img.set_alpha(alpha)
+            frame.blit(end_img, COORD_UP_LEFT)
+            frames.append(frame)
+        return frames
+
+    @property
+    def img(self):
+        '''
+        Picture representing the tile in its current state.
         '''
         if self._revealed:
             if self._target:
-                display_img = Tile.IMG_TARGET
+                return Tile.IMG_TARGET
             else:
-                display_img = Tile.IMG_WRONG
+                return Tile.IMG_WRONG
         else:
-            display_img = Tile.IMG_HIDDEN
-        display_surface.blit(display_img, window_coordinates)
+            return Tile.IMG_HIDDEN
 
 
     @property
@@ -118,7 +253,13 @@ class Grid(object):
     point the player needs to find back where the target tiles are.
     '''
 
+    ANIMATED = True                  # whether tiles are flipped with animations
+    REVEAL_ANIMATION = Tile.SQUASH
+    HIDE_ANIMATION = Tile.FADE
+    WAVE_DELAY = 2                   # frames between two diagonals of the wave
+
     def __init__(self, height, width, nb_target, window_size):
+        Tile.load_images()
         self._height = height
         self._width = width
 
@@ -130,19 +271,38 @@ class Grid(object):
         self._margin = ((width_window - width_grid) // 2,
                         (height_window - height_grid) // 2)
 
-        # randomly pick targets
-        targets = sample([(i, j) for i in range(width) for j in range(height)],
-                         nb_target)
+        self._targets = self.pick_targets(height, width, nb_target)
+        self._tiles = self.create_tiles(height, width, self._targets)
+
+        # window position of every tile, computed once so drawing the grid
+        # doesn't need to work out coordinates every frame
+        self._layout = [(tile, (self._margin[0] + j * (Tile.SIDE_TILE + MARGIN_TILE),
+                                self._margin[1] + i * (Tile.SIDE_TILE + MARGIN_TILE)))
+                        for i, row in enumerate(self._tiles)
+                        for j, tile in enumerate(row)]
+
+    @staticmethod
+    def pick_targets(height, width, nb_target):
+        '''
+        Randomly pick nb_target tiles to be targets. A frozenset of their
+        numbers, tiles being numbered row after row, is returned.
+        '''
+        return frozenset(sample(range(height * width), nb_target))
+
+    @staticmethod
+    def create_tiles(height, width, targets):
+        '''
+        Return rows of revealed tiles, those whose number is in targets being
+        targets.
+        '''
         # create tiles
-        self._tiles = []
+        tiles = []
         for j in range(height):
             a_row = []
             for i in range(width):
-                if (i, j) in targets:
-                    a_row.append(Tile(target=True, revealed=True))
-                else:
-                    a_row.append(Tile(target=False, revealed=True))
-            self._tiles.append(a_row)
+                a_row.append(Tile(target=j*width + i in targets, revealed=True))
+            tiles.append(a_row)
+        return tiles
 
     @property
     def height(self):
@@ -156,6 +316,19 @@ class Grid(object):
     def tiles(self):
         return self._tiles
 
+    def dump(self):
+        '''
+        Return a BoardDump of where the targets of this grid are.
+        '''
+        return BoardDump(self._height, self._width, self._targets)
+
+    @property
+    def positions(self):
+        '''
+        Return the window coordinates of the top-left corner of every tile.
+        '''
+        return [pos for _, pos in self._layout]
+
     @property
     def points(self):
         '''
@@ -174,18 +347,27 @@ class Grid(object):
 
     def hide_all(self):
         '''
-        Hide every tile of the grid.
+        Hide every tile of the grid. Tiles are flipped in a wave going from
+        the top-left corner to the bottom-right one.
         '''
-        for row in self._tiles:
-            for tile in row:
+        for i, row in enumerate(self._tiles):
+            for j, tile in enumerate(row):
+                previous_img = tile.img
                 tile.hide()
+                if self.ANIMATED:
+                    tile.animate(self.HIDE_ANIMATION, previous_img,
+                                 delay=(i + j) * self.WAVE_DELAY)
 
     def reveal_tile(self, coords):
         '''
         Reveal tile sitting at (row, column).
         '''
         tile = self.tile_at(coords)
-        return tile.reveal()
+        previous_img = tile.img
+        result = tile.reveal()
+        if self.ANIMATED and tile.img is not previous_img:
+            tile.animate(self.REVEAL_ANIMATION, previous_img)
+        return result
 
     def tile_at(self, coords):
         '''
@@ -193,7 +375,8 @@ class Grid(object):
         If there is no tile at this location, None is returned.
         '''
         # grid-wise coords 
-        x_grid, y_grid = (coord-margin for coord, margin in zip(coords, self._margin))
+        x_grid = coords[0] - self._margin[0]
+        y_grid = coords[1] - self._margin[1]
 
         width_grid = self._width * Tile.SIDE_TILE + (self._width - 1) * MARGIN_TILE
         height_grid = self._height * Tile.SIDE_TILE + (self._height - 1) * MARGIN_TILE
@@ -212,23 +395,216 @@ class Grid(object):
         '''
         Draw the whole grid on the given surface.
         '''
-        for i, row in enumerate(self._tiles):
-            for j, tile in enumerate(row):
-                x_window = self._margin[0] + j * (Tile.SIDE_TILE + MARGIN_TILE)
-                y_window = self._margin[1] + i * (Tile.SIDE_TILE + MARGIN_TILE)
-                tile.draw_at(surface, (x_window, y_window))
+        for tile, pos in self._layout:
+            tile.draw_at(surface, pos)
 
     def __getitem__(self, coords):
         return self.tiles[coords[0]][coords[1]]
 
     def __str__(self):
-        res = ''
-        for i in range(self.height):
-            for j in range(self.width):
-                res += '|{}'.format(self[i, j])
+        return ''.join('|{}|\n'.format('|'.join(map(str, row))) for row in self._tiles)
+
+
+class BoardDump:
+    '''
+    Immutable description of where the targets of a Grid are. Turning it into
+    a string draws the board as it is at the beginning of a game, which can be
+    left to another thread as the Grid isn't needed anymore.
+    '''
+
+    def __init__(self, height, width, targets):
+        self._height = height
+        self._width = width
+        self._targets = targets
+
+    def __str__(self):
+        lines = []
+        for j in range(self._height):
+            first = j * self._width
+            lines.append('|{}|'.format('|'.join('O' if i in self._targets else 'X'
+                                                for i in range(first, first + self._width))))
+        return '\n'.join(lines)
+
+
+class ScrollGrid(Grid):
+    '''
+    A Grid that may be far larger than the window. It is seen through a
+    Camera that can be moved and zoomed. Tiles are grouped in square chunks
+    whose rendering is cached: a chunk is only rendered again when one of its
+    tiles is changed through the ScrollGrid or when the zoom changes, and
+    only chunks that are onscreen are drawn.
+    '''
+
+    ANIMATED = False                     # animating would re-render chunks
+    CHUNK_SIDE = 16                      # number of tiles on a chunk's side
+    CACHE_PIXELS = 16 * 1024 * 1024      # pixels of rendered chunks kept
+
+    def __init__(self, height, width, nb_target, window_size):
+        Tile.load_images()
+        self._height = height
+        self._width = width
+        self._nb_target = nb_target
+        self._targets = self.pick_targets(height, width, nb_target)
+        self._tiles = self.create_tiles(height, width, self._targets)
+        self._points = 0
+
+        # geometry, in world coordinates the grid's top-left corner is (0, 0)
+        self._pitch = Tile.SIDE_TILE + MARGIN_TILE
+        self._chunk_world = self.CHUNK_SIDE * self._pitch
+        world_size = (width * self._pitch - MARGIN_TILE,
+                      height * self._pitch - MARGIN_TILE)
+        self.camera = utils.Camera(window_size, world_size)
+        self.camera.center_on((world_size[0] / 2, world_size[1] / 2))
+
+        # rendered chunks, least recently drawn first
+        self._chunks = OrderedDict()
+        self._chunk_zoom = None
+        self._scaled_imgs = {}
+
+    @property
+    def points(self):
+        return self._points
+
+    @property
+    def positions(self):
+        '''
+        Return the window coordinates of the top-left corner of every tile
+        that is onscreen.
+        '''
+        first_row, last_row, first_col, last_col = self._visible(self._pitch)
+        return [self.camera.to_screen((column * self._pitch, row * self._pitch))
+                for row in range(first_row, last_row + 1)
+                for column in range(first_col, last_col + 1)]
+
+    def reveal_all(self):
+        super().reveal_all()
+        self._points = self._nb_target
+        self.invalidate()
+
+    def hide_all(self):
+        super().hide_all()
+        self._points = 0
+        self.invalidate()
+
+    def reveal_tile(self, coords):
+        tile = self.tile_at(coords)
+        hidden = not tile.revealed
+        result = tile.reveal()
+        if hidden:
+            if tile.target:
+                self._points += 1
+            row, column = self.cell_at(coords)
+            self.invalidate(row, column)
+        return result
+
+    def cell_at(self, coords):
+        '''
+        Return the (row, column) of the tile sitting at coords, which are
+        window coordinates, or None if there is no tile at this location.
+        '''
+        x_world, y_world = self.camera.to_world(coords)
+        column, x_tile = divmod(int(x_world), self._pitch)
+        row, y_tile = divmod(int(y_world), self._pitch)
+        if (0 <= column < self._width and 0 <= row < self._height and
+            x_tile <= Tile.SIDE_TILE and y_tile <= Tile.SIDE_TILE):
+            return row, column
 
-            res += '|\n'
-        return res
+    def tile_at(self, coords):
+        cell = self.cell_at(coords)
+        if cell is not None:
+            return self[cell]
+
+    def invalidate(self, row=None, column=None):
+        '''
+        Forget the rendering of the chunk holding the tile at (row, column),
+        or of every chunk if no tile is given.
+        '''
+        if row is None:
+            self._chunks.clear()
+        else:
+            self._chunks.pop((row // self.CHUNK_SIDE, column // self.CHUNK_SIDE),
+                             None)
+
+    def draw(self, surface):
+        '''
+        Draw the chunks of the grid that are onscreen, rendering those that
+        aren't cached.
+        '''
+        zoom = self.camera.zoom
+        if zoom != self._chunk_zoom:
+            self.invalidate()
+            self._chunk_zoom = zoom
+        first_row, last_row, first_col, last_col = self._visible(self._chunk_world)
+        for chunk_row in range(first_row, last_row + 1):
+            for chunk_col in range(first_col, last_col + 1):
+                key = (chunk_row, chunk_col)
+                chunk = self._chunks.get(key)
+                if chunk is None:
+                    chunk = self._chunks[key] = self._render_chunk(chunk_row, chunk_col)
+                else:
+                    self._chunks.move_to_end(key)
+                pos = self.camera.to_screen((chunk_col * self._chunk_world,
+                                             chunk_row * self._chunk_world))
+                surface.blit(chunk, pos)
+
+        # drop least recently drawn chunks, always keeping the visible ones
+        keep = (last_row - first_row + 1) * (last_col - first_col + 1)
+        chunk_pixels = ceil(self._chunk_world * zoom) ** 2
+        keep = max(keep, self.CACHE_PIXELS // chunk_pixels)
+        while len(self._chunks) > keep:
+            self._chunks.popitem(last=False)
+
+    def _visible(self, cell_size):
+        '''
+        Return the first and last rows and columns of square cells of
+        cell_size world pixels that are onscreen.
+        '''
+        x_area, y_area, width_area, height_area = self.camera.visible_area()
+        last_row = (self._height * self._pitch - 1) // cell_size
+        last_col = (self._width * self._pitch - 1) // cell_size
+        return (max(int(y_area // cell_size), 0),
+                min(int((y_area + height_area) // cell_size), last_row),
+                max(int(x_area // cell_size), 0),
+                min(int((x_area + width_area) // cell_size), last_col))
+
+    def _render_chunk(self, chunk_row, chunk_col):
+        '''
+        Render the tiles of a chunk, at the current zoom, on a new Surface.
+        '''
+        zoom = self.camera.zoom
+        imgs = self._imgs(max(1, round(Tile.SIDE_TILE * zoom)))
+        side = ceil(self._chunk_world * zoom)
+        chunk = pygame.Surface((side, side))
+        chunk.fill(COLOR_BLACK)
+        row_start = chunk_row * self.CHUNK_SIDE
+        col_start = chunk_col * self.CHUNK_SIDE
+        rows = self._tiles[row_start:row_start+self.CHUNK_SIDE]
+        chunk.blits([(imgs[tile.img], (int(j * self._pitch * zoom),
+                                       int(i * self._pitch * zoom)))
+                     for i, row in enumerate(rows)
+                     for j, tile in enumerate(row[col_start:col_start+self.CHUNK_SIDE])],
+                    doreturn=False)
+        return chunk
+
+    def _imgs(self, side):
+        '''
+        Return a dict mapping every tile picture to its version side pixels
+        wide, scaled pictures are only computed once per size. With a
+        TILE_THEME, pictures are drawn at that size rather than scaled.
+        '''
+        imgs = self._scaled_imgs.get(side)
+        if imgs is None:
+            originals = (Tile.IMG_HIDDEN, Tile.IMG_TARGET, Tile.IMG_WRONG)
+            if side == Tile.SIDE_TILE:
+                imgs = dict(zip(originals, originals))
+            elif TILE_THEME:
+                import themes
+                imgs = dict(zip(originals, themes.tile_images(side, TILE_THEME)))
+            else:
+                imgs = {img: pygame.transform.smoothscale(img, (side, side))
+                        for img in originals}
+            self._scaled_imgs[side] = imgs
+        return imgs
 
 
 # sounds to be used by following Scene subclasses
@@ -239,9 +615,9 @@ def init_sounds():
     global ui_sound_ok
     global ui_sound_bad
     global ui_sound_menu
-    ui_sound_ok = pygame.mixer.Sound(SOUND_OK)
-    ui_sound_bad = pygame.mixer.Sound(SOUND_BAD)
-    ui_sound_menu = pygame.mixer.Sound(SOUND_MENU)
+    ui_sound_ok = assets.sound(SOUND_OK)
+    ui_sound_bad = assets.sound(SOUND_BAD)
+    ui_sound_menu = assets.sound(SOUND_MENU)
 
 
 class GameScene(utils.Scene):
@@ -258,39 +634,78 @@ class GameScene(utils.Scene):
         '_nb_target': 1,
         '_time': 3.5,
         '_tries': 5,
+        '_endless': False,
     }
     MEDIUM = {
         '_grid_dim': (4, 3),
         '_nb_target': 2,
         '_time': 2.5,
         '_tries': 3,
+        '_endless': False,
     }
     HARD = {
         '_grid_dim': (7, 5),
         '_nb_target': 3,
         '_time': 1.8,
         '_tries': 2,
+        '_endless': False,
+    }
+    # huge board seen through a camera, arrow keys or right click drag to
+    # move, mouse wheel to zoom
+    ENDLESS = {
+        '_grid_dim': (400, 400),
+        '_nb_target': 40,
+        '_time': 10,
+        '_tries': 20,
+        '_endless': True,
     }
+    PAN_SPEED = 15                        # camera speed with arrow keys (px/frame)
+    ZOOM_STEP = 1.25
+    PAUSE_KEYS = (pygame.K_ESCAPE, pygame.K_p)
+    PAUSE_DIM = 0.6                       # darkening of the game under the pause menu
 
     def __init__(self, stage, grid_dim=(4, 3), nb_target=2, time=2.5,
-                 total_tries=3, lives=3):
+                 total_tries=3, lives=3, endless=False):
         super().__init__(stage, self.NAME)
         self._time = time           # time tiles will be revealed at the beginning
         self._grid_dim = grid_dim   # size of Grid instances 
         self._nb_target = nb_target
         self._tries = total_tries   # number of tries before game over
         self._lives = lives         # number of game that can be lost before back to menu
+        self._endless = endless     # whether the Grid is a ScrollGrid
         self._level = 0
         self._remaining_lives = lives
         self._game_over = True
+        self._pause_requested = False
+        self._grid = None
         type(self).TIMER_ABS_HEIGHT = self.TIMER_REL_HEIGHT * STAGE_SIZE[1] // 100
+        # drawing resources reused from frame to frame
+        self._font_tries = None
+        self._tries_surfs = {}
+        self._timer_rect = pygame.Rect(0, STAGE_SIZE[1]-self.TIMER_ABS_HEIGHT,
+                                       0, self.TIMER_ABS_HEIGHT)
 
     # Implementation of Scene abstract methods
 
+    def update(self, inputs):
+        super().update(inputs)
+        # the pause menu is pushed once the game has been drawn, so that its
+        # snapshot shows the current Grid
+        if self._pause_requested:
+            self._pause_requested = False
+            self._stage.push(PauseMenu.NAME, self.PAUSE_DIM)
+
     def handle_inputs(self, inputs):
         # start new game
         if self._game_over:
             self.start_game()
+        # pause, the game isn't updated, timer included, until it is resumed
+        for an_input in inputs:
+            if an_input.type == pygame.KEYDOWN and an_input.key in self.PAUSE_KEYS:
+                self._pause_requested = True
+                return
+        if isinstance(self._grid, ScrollGrid):
+            self.move_camera(inputs)
         # phase 1: reveal tiles until timer is 0
         if self._timer:
             self._timer -= 1
@@ -305,20 +720,32 @@ class GameScene(utils.Scene):
                 # if click: reveal tile at this position
                 # if revealed tile is not target decrease remaining tries
                 # game over if no tries left or all target tiles have been found
-                if an_input.type == pygame.MOUSEBUTTONDOWN:
-                    pos = pygame.mouse.get_pos()
+                # on a ScrollGrid other buttons move the camera
+                if (an_input.type == pygame.MOUSEBUTTONDOWN and
+                    (not isinstance(self._grid, ScrollGrid) or an_input.button == 1)):
                     try:
-                        if not self._grid.reveal_tile(pos):        # wrong tile!
+                        if not self._grid.reveal_tile(an_input.pos):        # wrong tile!
                             ui_sound_bad.play()
                             self._remaining_tries -= 1
+                            logger.debug('miss at %s, %d tries left', an_input.pos,
+                                         self._remaining_tries)
+                            telemetry.record('click', level=self.level, hit=False,
+                                             tries=self._remaining_tries)
                         else:
                             ui_sound_ok.play()
+                            logger.debug('hit at %s', an_input.pos)
+                            telemetry.record('click', level=self.level, hit=True,
+                                             tries=self._remaining_tries)
 
                         if not self._remaining_tries:              # lost game
+                            logger.info('level %d lost', self.level)
+                            telemetry.record('level_end', level=self.level, won=False)
                             self.level -= 1
                             self._game_over = True               
                             self.lives -= 1
                         elif self._grid.points == self.nb_target:  # won game
+                            logger.info('level %d won', self.level)
+                            telemetry.record('level_end', level=self.level, won=True)
                             self.level += 1
                             self._game_over = True
                     # mouse clicked while not over a tile
@@ -330,19 +757,25 @@ class GameScene(utils.Scene):
         Draw grid, remaining tries, timer(, points?)
         '''
         self._stage.screen.fill(COLOR_BLACK)
+        self._grid.draw(self._stage.screen)
         self.draw_timer()
         self.draw_tries()
-        self._grid.draw(self._stage.screen)
 
     # Drawing sub-methods
 
     def draw_tries(self):
         '''
-        Write onscreen how many tries does the player have left.
+        Write onscreen how many tries does the player have left. Rendered
+        numbers are kept so that a given number is only rendered once.
         '''
-        font = pygame.font.Font(FONT_PRIM, FONT_SIZE_2)
-        txt_surf = font.render(str(self._remaining_tries), True, COLOR_ORANGE)
-        self._stage.screen.blit(txt_surf, (0,0))
+        txt_surf = self._tries_surfs.get(self._remaining_tries)
+        if txt_surf is None:
+            if self._font_tries is None:
+                self._font_tries = assets.font(FONT_PRIM, FONT_SIZE_2)
+            txt_surf = self._font_tries.render(str(self._remaining_tries), True,
+                                               COLOR_ORANGE)
+            self._tries_surfs[self._remaining_tries] = txt_surf
+        self._stage.screen.blit(txt_surf, COORD_UP_LEFT)
 
     def draw_timer(self):
         '''
@@ -350,13 +783,29 @@ class GameScene(utils.Scene):
         tiles are all revealed.
         '''
         if self._timer:
-            width = int((self._timer / (self._time * FPS)) * STAGE_SIZE[0])
-            rect = pygame.Rect(0, STAGE_SIZE[1]-self.TIMER_ABS_HEIGHT, 
-                               width, self.TIMER_ABS_HEIGHT)
-            pygame.draw.rect(self._stage.screen, COLOR_ORANGE, rect)
+            self._timer_rect.width = int((self._timer / (self._time * FPS)) * STAGE_SIZE[0])
+            pygame.draw.rect(self._stage.screen, COLOR_ORANGE, self._timer_rect)
     
     # Own functionnalities
 
+    def move_camera(self, inputs):
+        '''
+        Move the camera of a ScrollGrid with arrow keys or by dragging with
+        the right mouse button, and zoom with the mouse wheel.
+        '''
+        camera = self._grid.camera
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * self.PAN_SPEED
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * self.PAN_SPEED
+        if dx or dy:
+            camera.pan(dx, dy)
+        for an_input in inputs:
+            if an_input.type == pygame.MOUSEWHEEL:
+                factor = self.ZOOM_STEP if an_input.y > 0 else 1 / self.ZOOM_STEP
+                camera.zoom_at(factor, pygame.mouse.get_pos())
+            elif an_input.type == pygame.MOUSEMOTION and an_input.buttons[2]:
+                camera.pan(-an_input.rel[0], -an_input.rel[1])
+
     def start_game(self):
         '''
         Instanciate Grid, initialize _remaining_tries and timer.
@@ -364,9 +813,19 @@ class GameScene(utils.Scene):
         self._game_over = False
         self._remaining_tries = self._tries   # current number of tries (to be decreased)
         self._timer = self._time * FPS        # timer (to be decreased) 
-        self._grid = Grid(*self.grid_dim, self.nb_target, STAGE_SIZE)
-        print(self._grid, self.level)         # cheat mode ON
+        grid_class = ScrollGrid if self._endless else Grid
+        self._grid = grid_class(*self.grid_dim, self.nb_target, STAGE_SIZE)
+        logger.info('level %d started, %d lives left', self.level, self.lives)
+        telemetry.record('level_start', level=self.level, lives=self.lives,
+                         grid=self.grid_dim, targets=self.nb_target,
+                         endless=self._endless)
+        if logger.isEnabledFor(logging.DEBUG):   # cheat mode
+            logger.debug('board of level %d:\n%s', self.level, self._grid.dump())
+
 
+    @property
+    def grid(self):
+        return self._grid
 
     @property
     def nb_target(self):
@@ -374,7 +833,7 @@ class GameScene(utils.Scene):
 
     @property
     def grid_dim(self):
-        return (dim + self.level // 5 for dim in self._grid_dim)
+        return tuple(dim + self.level // 5 for dim in self._grid_dim)
 
     @property
     def lives(self):
@@ -398,6 +857,8 @@ class GameScene(utils.Scene):
     def difficulty(self, new_difficulty):
         for name, value in new_difficulty.items():
             setattr(self, name, value)
+        # a game left unfinished doesn't go on with a Grid of another kind
+        self._game_over = True
 
     @property
     def level(self):
@@ -425,6 +886,7 @@ class MemozMenu(utils.Menu):
     MSG_RMARGIN = 1.2
     NAV_INFLATE = (1.7, 0.9)
     NAV_RMARGIN = 1.3
+    BACKGROUND = COLOR_BLACK
 
     def __init__(self, stage, title, name, nav=None, msg=None):
         '''
@@ -435,8 +897,11 @@ class MemozMenu(utils.Menu):
               to other Scenes. 
             - msg can contain a string that will be displayed using FONT_PRIM
         '''
-        surf = pygame.Surface(STAGE_SIZE)
-        surf.fill(COLOR_BLACK)
+        if len(self.BACKGROUND) == 4:        # translucent background
+            surf = pygame.Surface(STAGE_SIZE, pygame.SRCALPHA)
+        else:
+            surf = pygame.Surface(STAGE_SIZE)
+        surf.fill(self.BACKGROUND)
 
 
         pos_y = self.draw_title(surf, title)
@@ -461,7 +926,7 @@ class MemozMenu(utils.Menu):
         pos_y = self.TITLE_MARGIN
         square_size = 0.9 * width_title // len(title)      # title is 90% squares 10% margin
         margin_size = (width_title - len(title) * square_size) // (len(title) - 1)
-        mem_font = pygame.font.Font(FONT_TITLE, round(0.8*square_size))
+        mem_font = assets.font(FONT_TITLE, round(0.8*square_size))
         for i, letter in enumerate(title):
             x_rect = self.pos_x + (square_size+margin_size)*i
             rect = pygame.Rect((x_rect, pos_y),
@@ -481,7 +946,7 @@ class MemozMenu(utils.Menu):
         Write down msg on surf starting from pos_y. It returns a pos_y from 
         where it is safe to draw other elements.
         '''
-        msg_font = pygame.font.Font(FONT_PRIM, FONT_SIZE_2)
+        msg_font = assets.font(FONT_PRIM, FONT_SIZE_2)
         for line in msg.split('\n'):
             line_surf = msg_font.render(line, True, COLOR_YELLOW)
             pos_x = (STAGE_SIZE[0] - line_surf.get_width()) // 2
@@ -495,7 +960,7 @@ class MemozMenu(utils.Menu):
         the widget surface starting from pos_y.
         '''
         # determine buttons' size depending on the longest name
-        font = pygame.font.Font(FONT_PRIM, FONT_SIZE_2)
+        font = assets.font(FONT_PRIM, FONT_SIZE_2)
         msize = max((font.size(name) for (name, _) in nav), key=lambda x_y: x_y[0])
         # inflate
         msize = tuple(round(dim * factor) for dim, factor in zip(msize, self.NAV_INFLATE))
@@ -514,6 +979,24 @@ class MemozMenu(utils.Menu):
             real_action = ring_and_action(action)
             button = utils.Button.fromstring(name, real_action, fontfile=FONT_PRIM,
                                              size_px=FONT_SIZE_2, font_color=COLOR_BLACK,
-                                             bg_color=COLOR_BLUE_1, size=msize)
+                                             bg_color=COLOR_BLUE_1, size=msize,
+                                             hover_color=COLOR_BLUE_2)
             super().add_button_at(button, (pos_x, pos_y))
             pos_y += b_height * self.NAV_RMARGIN
+
+
+class PauseMenu(MemozMenu, utils.OverlayMenu):
+    '''
+    MemozMenu played over the game when it is paused, the game stays visible
+    under it.
+    '''
+    NAME = 'pause'
+    BACKGROUND = (0, 0, 0, 0)
+
+    def __init__(self, stage):
+        nav = (
+            ('Resume', stage.pop),
+            ('Main menu', stage.nav_link(stage.MAIN)),
+            ('Quit', stage.nav_link(stage.QUIT)),
+        )
+        super().__init__(stage, 'Pause', self.NAME, nav=nav)
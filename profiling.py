@@ -0,0 +1,246 @@
+#! /usr/bin/env python3
+
+'''
+Allocation tracking for the memoz game. An AllocationTracker is registered as
+an observer of a Stage and measures, with tracemalloc and the garbage
+collector's counters, how much memory every frame allocates. Results are
+gathered per Scene.
+To get a report of the allocations of every Scene, run:
+    python3 profiling.py
+To check that menus and idle boards don't allocate once they reached a steady
+state, run:
+    python3 profiling.py --check
+To measure how long the game takes to show its first frame, run:
+    python3 profiling.py --startup
+This module needs Python 3.9 or later (tracemalloc.reset_peak).
+date: October 2026
+'''
+
+import gc
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+class SceneAllocations:
+    '''
+    Allocation counters accumulated over all the frames a Scene was played.
+    '''
+
+    def __init__(self):
+        self.frames = 0
+        self.net_bytes = 0        # memory still allocated at the end of frames
+        self.peak_bytes = 0       # largest amount allocated during one frame
+        self.gc_objects = 0       # container objects left alive by frames
+        self.collections = 0      # garbage collections triggered by frames
+
+    @property
+    def net_per_frame(self):
+        return self.net_bytes / self.frames if self.frames else 0
+
+    def __str__(self):
+        return '{:6d} frames {:10.1f} B/frame net {:8d} B peak {:6d} objects {:4d} gc'.format(
+            self.frames, self.net_per_frame, self.peak_bytes, self.gc_objects,
+            self.collections)
+
+
+class AllocationTracker:
+    '''
+    Stage observer measuring allocations done during each frame. Measures are
+    filed under the name of the Scene being played when the frame began.
+    '''
+
+    def __init__(self):
+        self._scenes = {}
+        self._scene = None
+        self._started_tracing = False
+        self._mem_before = 0
+        self._objects_before = 0
+        self._collections_before = 0
+
+    def start(self):
+        '''
+        Start tracing memory allocations, it needs to be called before the
+        first frame is measured.
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        '''
+        Stop tracing memory allocations if this tracker started it.
+        '''
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self):
+        '''
+        Forget every measure made so far.
+        '''
+        self._scenes.clear()
+
+    def frame_begin(self, stage):
+        self._scene = stage.overlay or stage.target
+        self._collections_before = self._count_collections()
+        self._objects_before = gc.get_count()[0]
+        tracemalloc.reset_peak()
+        self._mem_before = tracemalloc.get_traced_memory()[0]
+
+    def frame_end(self, stage):
+        mem_after, peak = tracemalloc.get_traced_memory()
+        objects_after = gc.get_count()[0]
+        collections = self._count_collections() - self._collections_before
+        allocs = self._scenes.get(self._scene)
+        if allocs is None:
+            allocs = self._scenes[self._scene] = SceneAllocations()
+        allocs.frames += 1
+        allocs.net_bytes += mem_after - self._mem_before
+        allocs.peak_bytes = max(allocs.peak_bytes, peak - self._mem_before)
+        allocs.collections += collections
+        # the generation 0 counter is reset by a collection, it is only
+        # meaningful for frames during which no collection happened
+        if not collections:
+            allocs.gc_objects += objects_after - self._objects_before
+
+    def __getitem__(self, scene_name):
+        return self._scenes[scene_name]
+
+    def report(self):
+        '''
+        Return a string describing allocations of every measured Scene.
+        '''
+        width = max((len(name) for name in self._scenes), default=0)
+        return '\n'.join('{:{}} {}'.format(name, width, allocs)
+                         for name, allocs in self._scenes.items())
+
+    @staticmethod
+    def _count_collections():
+        return sum(stats['collections'] for stats in gc.get_stats())
+
+
+def steady_state(stage, scene_name, warmup=200, frames=200, tracker=None):
+    '''
+    Play the Scene scene_name of stage for warmup frames, then measure its
+    allocations during frames frames. The SceneAllocations of the measured
+    frames is returned. Overlays are pushed over the Scene being played.
+    '''
+    from utils import OverlayMenu
+    if tracker is None:
+        tracker = AllocationTracker()
+    if isinstance(stage[scene_name], OverlayMenu):
+        stage.push(scene_name)
+    else:
+        stage.target = scene_name
+    for _ in range(warmup):
+        stage.step()
+    tracker.start()
+    stage.add_observer(tracker)
+    try:
+        # a couple of frames are measured then forgotten, so that allocations
+        # made once by tracemalloc and the tracker aren't blamed on the Scene
+        for _ in range(2):
+            stage.step()
+        tracker.reset()
+        for _ in range(frames):
+            stage.step()
+    finally:
+        stage.remove_observer(tracker)
+        tracker.stop()
+    return tracker[scene_name]
+
+
+def check_steady_state(stage, scene_name, warmup=200, frames=200, tolerance=0):
+    '''
+    Raise an AssertionError if the Scene scene_name keeps allocating memory
+    or triggers garbage collections once warmup frames have been played.
+    Some memory, less than tolerance bytes, may be kept by the interpreter's
+    free lists.
+    '''
+    allocs = steady_state(stage, scene_name, warmup, frames)
+    assert allocs.net_bytes <= tolerance, \
+        '{}: {} bytes allocated in steady state'.format(scene_name, allocs.net_bytes)
+    assert allocs.gc_objects <= 0, \
+        '{}: {} objects left alive in steady state'.format(scene_name, allocs.gc_objects)
+    assert not allocs.collections, \
+        '{}: {} collections in steady state'.format(scene_name, allocs.collections)
+    return allocs
+
+
+def run(check=False):
+    '''
+    Measure every Scene of the game under SDL's dummy drivers and print a
+    report. If check is True, idle Scenes are expected not to allocate.
+    '''
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import main
+    stage = main.build_stage(fps=0)
+    stage.run_deferred()
+    tracker = AllocationTracker()
+    try:
+        for scene_name in list(stage):
+            if check:
+                allocs = check_steady_state(stage, scene_name)
+            else:
+                allocs = steady_state(stage, scene_name, tracker=tracker)
+            print('{}: {}'.format(scene_name, allocs))
+    finally:
+        stage.quit()
+
+
+# code run by a fresh interpreter to measure the startup of the game
+STARTUP_SCRIPT = '''
+import main
+stage = main.build_stage()
+stage.step()
+print('first frame', flush=True)
+while stage.pending:
+    stage.step()
+print('ready', flush=True)
+stage.quit()
+'''
+
+
+def startup_time(runs=5):
+    '''
+    Start the game runs times in a new interpreter, under SDL's dummy
+    drivers, and return the median times in seconds it took to display the
+    first frame and to finish the work deferred at startup. Times include the
+    interpreter's own startup.
+    '''
+    env = dict(os.environ)
+    env.setdefault('SDL_VIDEODRIVER', 'dummy')
+    env.setdefault('SDL_AUDIODRIVER', 'dummy')
+    env['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    first_frames = []
+    readies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        child = subprocess.Popen([sys.executable, '-c', STARTUP_SCRIPT],
+                                 cwd=os.path.dirname(os.path.abspath(__file__)),
+                                 env=env, stdout=subprocess.PIPE, text=True)
+        for line in child.stdout:
+            if line.startswith('first frame'):
+                first_frames.append(time.perf_counter() - start)
+            elif line.startswith('ready'):
+                readies.append(time.perf_counter() - start)
+        if child.wait():
+            raise RuntimeError('the game exited with status {}'.format(child.returncode))
+    return statistics.median(first_frames), statistics.median(readies)
+
+
+if __name__ == '__main__':
+    if '--startup' in sys.argv[1:]:
+        first_frame, ready = startup_time()
+        print('first frame: {:.1f} ms, ready: {:.1f} ms'.format(1000*first_frame,
+                                                              1000*ready))
+        sys.exit()
+    try:
+        run(check='--check' in sys.argv[1:])
+    except AssertionError as error:
+        sys.exit(str(error))
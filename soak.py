@@ -0,0 +1,205 @@
+#! /usr/bin/env python3
+
+'''
+Soak test for the memoz game. The real Stage built by main.py is played under
+SDL's dummy drivers for a long time while a SyntheticPlayer clicks on menu
+buttons and grid tiles through the event queue. At regular intervals, memory
+usage, number of live surfaces, frame times and mixer channel usage are
+written to a timeline file so leaks and slow degradation can be spotted.
+To run a one hour soak test, type:
+    python3 soak.py --duration 3600 --timeline soak.csv
+date: October 2026
+'''
+
+import argparse
+import csv
+import gc
+import os
+import random
+import resource
+import time
+
+
+def rss_bytes():
+    '''
+    Return the resident set size of this process in bytes. Where /proc is not
+    available the peak resident set size is returned instead.
+    '''
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def count_instances(*types):
+    '''
+    Count objects of the given types that are referenced by objects the
+    garbage collector knows about. pygame objects aren't tracked by the
+    collector themselves, they are found through what refers to them.
+    '''
+    seen = set()
+    counts = dict.fromkeys(types, 0)
+    for obj in gc.get_objects():
+        for referent in gc.get_referents(obj):
+            if isinstance(referent, types) and id(referent) not in seen:
+                seen.add(id(referent))
+                counts[type(referent)] += 1
+    return counts
+
+
+class SyntheticPlayer:
+    '''
+    Stage observer that posts mouse clicks on the event queue. On a Menu it
+    clicks one of the buttons, except those in avoid, on a GameScene it clicks
+    one of the tiles of the grid. Clicks happen on average every
+    click_interval frames.
+    '''
+
+    def __init__(self, click_interval=20, avoid=('Quit',), seed=None):
+        self._click_interval = click_interval
+        self._avoid = set(avoid)
+        self._random = random.Random(seed)
+        self.clicks = 0
+
+    def frame_begin(self, stage):
+        pass
+
+    def frame_end(self, stage):
+        import pygame
+        if self._random.randrange(self._click_interval):
+            return
+        pos = self.pick_position(stage.current_scene)
+        if pos is not None:
+            for event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                pygame.event.post(pygame.event.Event(event_type, pos=pos, button=1))
+            self.clicks += 1
+
+    def pick_position(self, scene):
+        '''
+        Return window coordinates worth clicking in scene, or None.
+        '''
+        import memoz
+        import utils
+        if isinstance(scene, utils.Menu):
+            zones = [zone for zone, button in scene.buttons
+                     if button.label not in self._avoid]
+            if zones:
+                return self._random.choice(zones).center
+        elif isinstance(scene, memoz.GameScene) and scene.grid is not None:
+            x_tile, y_tile = self._random.choice(scene.grid.positions)
+            half = memoz.Tile.SIDE_TILE // 2
+            return (x_tile + half, y_tile + half)
+        return None
+
+
+class Timeline:
+    '''
+    Stage observer that measures frame times and, every interval seconds,
+    writes a sample of the process' health to a csv file.
+    '''
+
+    FIELDS = ('elapsed', 'frames', 'scene', 'rss', 'surfaces', 'fonts',
+              'sounds', 'frame_ms', 'frame_ms_max', 'drift', 'busy_channels',
+              'channels', 'clicks')
+
+    def __init__(self, path, interval=10, player=None):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.FIELDS)
+        self._interval = interval
+        self._player = player
+        self._start = time.perf_counter()
+        self._next_sample = self._start + interval
+        self._frame_start = 0
+        self._frames = 0
+        self._window_frames = 0
+        self._window_time = 0
+        self._window_max = 0
+        self._baseline_ms = None
+
+    def frame_begin(self, stage):
+        self._frame_start = time.perf_counter()
+
+    def frame_end(self, stage):
+        now = time.perf_counter()
+        frame_time = now - self._frame_start
+        self._frames += 1
+        self._window_frames += 1
+        self._window_time += frame_time
+        self._window_max = max(self._window_max, frame_time)
+        if now >= self._next_sample:
+            self.sample(stage, now)
+            self._next_sample = now + self._interval
+
+    def sample(self, stage, now):
+        '''
+        Write one row of the timeline. Frame times are averaged over the
+        frames played since the previous row, drift is that average relative
+        to the one of the first row.
+        '''
+        import pygame
+        frame_ms = 1000 * self._window_time / max(self._window_frames, 1)
+        if self._baseline_ms is None:
+            self._baseline_ms = frame_ms
+        counts = count_instances(pygame.Surface, pygame.font.Font,
+                                 pygame.mixer.Sound)
+        channels = pygame.mixer.get_num_channels() if pygame.mixer.get_init() else 0
+        busy = sum(pygame.mixer.Channel(i).get_busy() for i in range(channels))
+        self._writer.writerow((
+            round(now - self._start, 1), self._frames, stage.target, rss_bytes(),
+            counts[pygame.Surface], counts[pygame.font.Font],
+            counts[pygame.mixer.Sound], round(frame_ms, 3),
+            round(1000 * self._window_max, 3),
+            round(frame_ms / self._baseline_ms, 3) if self._baseline_ms else 1,
+            busy, channels, self._player.clicks if self._player else 0))
+        self._file.flush()
+        self._window_frames = 0
+        self._window_time = 0
+        self._window_max = 0
+
+    def close(self):
+        self._file.close()
+
+
+def soak(duration, timeline_path, interval=10, fps=None, click_interval=20,
+         seed=None):
+    '''
+    Play the game for duration seconds with a SyntheticPlayer and record a
+    Timeline in timeline_path. If fps is 0, frames aren't throttled.
+    '''
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import main
+    from config import FPS
+    stage = main.build_stage(fps=FPS if fps is None else fps)
+    player = SyntheticPlayer(click_interval, seed=seed)
+    timeline = Timeline(timeline_path, interval, player)
+    stage.add_observer(timeline)
+    stage.add_observer(player)
+    end = time.perf_counter() + duration
+    try:
+        while stage.active and time.perf_counter() < end:
+            stage.step()
+    finally:
+        timeline.close()
+        stage.quit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Soak test for memoz.')
+    parser.add_argument('--duration', type=float, default=3600,
+                        help='seconds to play (default: 3600)')
+    parser.add_argument('--timeline', default='soak.csv',
+                        help='csv file the timeline is written to')
+    parser.add_argument('--interval', type=float, default=10,
+                        help='seconds between two timeline rows')
+    parser.add_argument('--fps', type=int, default=None,
+                        help='framerate, 0 to play as fast as possible')
+    parser.add_argument('--click-interval', type=int, default=20,
+                        help='average number of frames between two clicks')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    soak(args.duration, args.timeline, args.interval, args.fps,
+         args.click_interval, args.seed)
@@ -0,0 +1,243 @@
+#! /usr/bin/env python3
+
+'''
+Run several instances of the memoz game on one host, typically one per kiosk
+screen. The supervisor decodes the game's pictures and sounds once and puts
+the decoded pixels and PCM samples, along with the font files, in a block of
+shared memory. Every instance is a child process that takes its resources
+from that block: pictures are Surfaces built directly over the shared pixels
+and fonts are read from it, only sounds get copied since pygame keeps its own
+copy of a Sound's samples, but they aren't decoded again.
+To run three instances, one per screen, restarting those that crash, type:
+    python3 supervisor.py --instances 3 --restart
+This module needs Python 3.8 (multiprocessing.shared_memory) and pygame 2.1.3
+(pygame.image.tobytes) or later.
+date: October 2026
+'''
+
+import argparse
+import io
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+from config import *
+
+logger = logging.getLogger(__name__)
+
+IMAGES = (PATH_TILE_HIDDEN, PATH_TILE_TARGET, PATH_TILE_WRONG, ICON)
+SOUNDS = (SOUND_OK, SOUND_BAD, SOUND_MENU)
+FONTS = (FONT_TITLE, FONT_PRIM)
+
+
+class SharedAssets:
+    '''
+    Decoded resources held in a block of shared memory owned by the
+    supervisor. The manifest describes where each resource sits in the block,
+    it is what instances need, along with the block's name, to use them.
+    '''
+    IMAGE = 'image'
+    SOUND = 'sound'
+    FONT = 'font'
+
+    def __init__(self, images=IMAGES, sounds=SOUNDS, fonts=FONTS):
+        import pygame
+        blobs = []          # (path, kind, data, details)
+        for path in images:
+            img = pygame.image.load(path)
+            blobs.append((path, self.IMAGE, pygame.image.tobytes(img, 'RGBA'),
+                          img.get_size()))
+        # sounds are decoded in the format instances ask the mixer for, the
+        # dummy driver avoids needing a sound card
+        driver = os.environ.get('SDL_AUDIODRIVER')
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        try:
+            pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, buffer=MIXER_BUFFER)
+            self.mixer_format = pygame.mixer.get_init()
+            for path in sounds:
+                blobs.append((path, self.SOUND, pygame.mixer.Sound(path).get_raw(), None))
+            pygame.mixer.quit()
+        finally:
+            if driver is None:
+                del os.environ['SDL_AUDIODRIVER']
+            else:
+                os.environ['SDL_AUDIODRIVER'] = driver
+        for path in fonts:
+            with open(path, 'rb') as font_file:
+                blobs.append((path, self.FONT, font_file.read(), None))
+
+        size = sum(len(data) for _, _, data, _ in blobs)
+        self._memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.manifest = {}
+        offset = 0
+        for path, kind, data, details in blobs:
+            self._memory.buf[offset:offset+len(data)] = data
+            self.manifest[path] = (kind, offset, len(data), details)
+            offset += len(data)
+        logger.info('%d resources shared, %d bytes', len(blobs), size)
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    def close(self):
+        '''
+        Release the shared memory, instances must have exited.
+        '''
+        self._memory.close()
+        self._memory.unlink()
+
+
+class _AttachedMemory(shared_memory.SharedMemory):
+    '''
+    Shared memory attached to by an instance. Surfaces use it until the
+    process exits, so it is never closed explicitly: the mapping goes away
+    with the last view of it.
+    '''
+
+    def __del__(self):
+        pass
+
+
+class SharedAssetView:
+    '''
+    Instance side of SharedAssets, to be installed with assets.install.
+    '''
+
+    def __init__(self, name, manifest, mixer_format):
+        # instances share the supervisor's resource tracker, registering the
+        # block again there, as Python < 3.13 does, changes nothing
+        self._memory = _AttachedMemory(name=name)
+        self._manifest = manifest
+        self._mixer_format = mixer_format
+
+    def _view(self, path, kind):
+        entry = self._manifest.get(path)
+        if entry is None or entry[0] != kind:
+            return None, None
+        _, offset, length, details = entry
+        return self._memory.buf[offset:offset+length], details
+
+    def image(self, path):
+        import pygame
+        view, size = self._view(path, SharedAssets.IMAGE)
+        if view is None:
+            return None
+        # the Surface uses the shared pixels, it must never be drawn on
+        return pygame.image.frombuffer(view, size, 'RGBA')
+
+    def sound(self, path):
+        import pygame
+        view, _ = self._view(path, SharedAssets.SOUND)
+        if view is None or pygame.mixer.get_init() != self._mixer_format:
+            return None
+        return pygame.mixer.Sound(buffer=view)
+
+    def font(self, path, size):
+        import pygame
+        view, _ = self._view(path, SharedAssets.FONT)
+        if view is None:
+            return None
+        return pygame.font.Font(SharedFile(view), size)
+
+
+class SharedFile(io.RawIOBase):
+    '''
+    Read-only file over a memoryview, that doesn't copy the whole content
+    as io.BytesIO would.
+    '''
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self._view[self._pos:self._pos+len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+
+def run_instance(index, name, manifest, mixer_format, log):
+    '''
+    Body of an instance's process.
+    '''
+    import assets
+    import main
+    assets.install(SharedAssetView(name, manifest, mixer_format))
+    try:
+        main.game(log=log, display=index)
+    except KeyboardInterrupt:
+        # interrupting the supervisor from a terminal interrupts its group
+        pass
+
+
+def supervise(instances, restart=False, log=''):
+    '''
+    Start instances games and wait for them to exit. If restart is True,
+    games exiting with an error are started again.
+    '''
+    import logs
+    logs.setup(log)
+    shared = SharedAssets()
+    context = multiprocessing.get_context('spawn')
+
+    def start(index):
+        process = context.Process(target=run_instance, name='memoz-{}'.format(index),
+                                  args=(index, shared.name, shared.manifest,
+                                        shared.mixer_format, log))
+        process.start()
+        logger.info('instance %d started, pid %d', index, process.pid)
+        return process
+
+    processes = {index: start(index) for index in range(instances)}
+    try:
+        while processes:
+            time.sleep(1)
+            for index, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                logger.info('instance %d exited with status %d', index, process.exitcode)
+                if restart and process.exitcode:
+                    processes[index] = start(index)
+                else:
+                    del processes[index]
+    finally:
+        for process in processes.values():
+            process.terminate()
+            process.join()
+        shared.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run several memoz games.')
+    parser.add_argument('--instances', type=int, default=2)
+    parser.add_argument('--restart', action='store_true',
+                        help='start again games that exit with an error')
+    parser.add_argument('--log', metavar='LEVELS', default='INFO',
+                        help="logging levels, e.g. 'INFO,memoz=DEBUG'")
+    args = parser.parse_args()
+    try:
+        supervise(args.instances, args.restart, args.log)
+    except KeyboardInterrupt:
+        pass
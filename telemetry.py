@@ -0,0 +1,322 @@
+#! /usr/bin/env python3
+
+'''
+Telemetry for the memoz game. Gameplay and performance events are recorded
+into a bounded in-memory buffer, which costs the frame thread an append and
+nothing else. A background thread sends events in gzip-compressed batches of
+JSON lines to a collector, over HTTP or over HTTP on a UNIX socket. When the
+collector can't be reached, batches are appended to a local fallback file and
+sending is retried with an exponential backoff. When the buffer is full, new
+events are dropped and counted.
+Nothing is recorded until start() has been called. To run a stand-in
+collector writing the events it receives to events.jsonl, type:
+    python3 telemetry.py --serve 127.0.0.1:8125 --out events.jsonl
+and play with:
+    python3 main.py --telemetry http://127.0.0.1:8125/events
+A UNIX socket is given as unix:/path/to/socket in both cases.
+The game imports this module at startup, modules only needed to send events
+or to run the collector are therefore imported when they are used.
+date: October 2026
+'''
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_exporter = None
+
+
+def record(kind, **fields):
+    '''
+    Record an event of the given kind. It does nothing unless telemetry has
+    been started.
+    '''
+    if _exporter is not None:
+        _exporter.record(kind, fields)
+
+
+def start(endpoint, fallback=None, **options):
+    '''
+    Start sending events to endpoint, options are those of Exporter.
+    '''
+    global _exporter
+    if _exporter is None:
+        _exporter = Exporter(endpoint, fallback, **options)
+        _exporter.start()
+        atexit.register(stop)
+    return _exporter
+
+
+def stop():
+    '''
+    Send the events left and stop the background thread.
+    '''
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
+
+
+class Exporter:
+    '''
+    Buffer of events and the thread sending them. Every interval seconds, or
+    sooner once batch_size events are waiting, batches are sent. capacity is
+    the number of events the buffer holds before dropping new ones.
+    '''
+
+    def __init__(self, endpoint, fallback=None, capacity=10000, batch_size=500,
+                 interval=5, timeout=5, max_backoff=300):
+        self._endpoint = endpoint
+        self._fallback = fallback
+        self._capacity = capacity
+        self._batch_size = batch_size
+        self._interval = interval
+        self._timeout = timeout
+        self._max_backoff = max_backoff
+        self._events = deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._backoff = 0
+        self._retry_at = 0
+        # counters
+        self.recorded = 0
+        self.dropped = 0
+        self.sent = 0
+        self.failures = 0
+        self.fallen_back = 0
+
+    def record(self, kind, fields):
+        '''
+        Add an event to the buffer, meant to be called from the frame thread.
+        '''
+        if len(self._events) >= self._capacity:
+            self.dropped += 1
+            return
+        self._events.append((time.time(), kind, fields))
+        self.recorded += 1
+        if len(self._events) == self._batch_size:
+            self._wake.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='telemetry',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info('telemetry: %d events recorded, %d sent, %d dropped, '
+                    '%d failed batches, %d batches in fallback file',
+                    self.recorded, self.sent, self.dropped, self.failures,
+                    self.fallen_back)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self._flush()
+        # last chance for the events left, waiting for a backoff isn't an
+        # option anymore
+        self._retry_at = 0
+        self._flush()
+
+    def _flush(self):
+        while self._events:
+            batch = []
+            while self._events and len(batch) < self._batch_size:
+                batch.append(self._events.popleft())
+            self._send(batch)
+
+    def _encode(self, batch):
+        import gzip
+        import json
+        lines = [json.dumps(dict(fields, time=moment, kind=kind), separators=(',', ':'))
+                 for moment, kind, fields in batch]
+        lines.append('')
+        return gzip.compress('\n'.join(lines).encode('utf-8'))
+
+    def _send(self, batch):
+        import http.client
+        import random
+        body = self._encode(batch)
+        if time.monotonic() >= self._retry_at:
+            try:
+                self._post(body)
+            except (OSError, http.client.HTTPException) as error:
+                self.failures += 1
+                self._backoff = min(max(2 * self._backoff, 1), self._max_backoff)
+                # jitter keeps instances of a fleet from retrying together
+                self._retry_at = time.monotonic() + self._backoff * random.uniform(0.5, 1)
+                logger.warning('telemetry: sending failed (%s), retrying in %d s',
+                               error, self._backoff)
+            else:
+                self.sent += len(batch)
+                self._backoff = 0
+                return
+        self._write_fallback(body, len(batch))
+
+    def _post(self, body):
+        import http.client
+        import socket
+        from urllib.parse import urlsplit
+        url = urlsplit(self._endpoint)
+        if url.scheme == 'unix':
+            # an HTTPConnection uses the socket it is given, if any
+            connection = http.client.HTTPConnection('localhost', timeout=self._timeout)
+            connection.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.sock.settimeout(self._timeout)
+            path = '/events'
+            try:
+                connection.sock.connect(url.path)
+            except OSError:
+                connection.close()
+                raise
+        elif url.scheme == 'https':
+            connection = http.client.HTTPSConnection(url.netloc, timeout=self._timeout)
+            path = url.path or '/'
+        else:
+            connection = http.client.HTTPConnection(url.netloc, timeout=self._timeout)
+            path = url.path or '/'
+        try:
+            connection.request('POST', path, body, {
+                'Content-Type': 'application/x-ndjson',
+                'Content-Encoding': 'gzip',
+            })
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 300:
+                raise http.client.HTTPException('status {}'.format(response.status))
+        finally:
+            connection.close()
+
+    def _write_fallback(self, body, length):
+        '''
+        Append a batch of length events to the fallback file, gzip members
+        can be concatenated and still be read as a single file. Without a
+        fallback file, the batch is dropped.
+        '''
+        if self._fallback is None:
+            self.dropped += length
+            return
+        try:
+            with open(self._fallback, 'ab') as fallback:
+                fallback.write(body)
+        except OSError as error:
+            self.dropped += length
+            logger.warning('telemetry: writing to %s failed (%s)', self._fallback, error)
+        else:
+            self.fallen_back += 1
+
+
+class FrameStats:
+    '''
+    Stage observer recording, every period seconds, a summary of frame
+    times: number of frames, mean and longest frame, and frames over budget.
+    '''
+
+    def __init__(self, fps, period=10):
+        self._budget = 1 / fps if fps else None
+        self._period = period
+        self._frame_start = 0
+        self._reset(time.perf_counter())
+
+    def _reset(self, now):
+        self._window_start = now
+        self._frames = 0
+        self._total = 0
+        self._longest = 0
+        self._over_budget = 0
+
+    def frame_begin(self, stage):
+        self._frame_start = time.perf_counter()
+
+    def frame_end(self, stage):
+        now = time.perf_counter()
+        frame_time = now - self._frame_start
+        self._frames += 1
+        self._total += frame_time
+        if frame_time > self._longest:
+            self._longest = frame_time
+        if self._budget is not None and frame_time > self._budget:
+            self._over_budget += 1
+        if now - self._window_start >= self._period:
+            record('frames', scene=stage.overlay or stage.target, frames=self._frames,
+                   mean_ms=round(1000 * self._total / self._frames, 3),
+                   max_ms=round(1000 * self._longest, 3),
+                   over_budget=self._over_budget)
+            self._reset(now)
+
+
+def serve(address, output_path):
+    '''
+    Run the stand-in collector on address, host:port or unix:path, until
+    interrupted.
+    '''
+    import gzip
+    import http.server
+    import socketserver
+
+    class CollectorHandler(http.server.BaseHTTPRequestHandler):
+        '''
+        Request handler of the stand-in collector, it appends the events of
+        every batch to the server's output file.
+        '''
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            with self.server.lock:
+                self.server.output.write(body.decode('utf-8'))
+                self.server.output.flush()
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            request, _ = super().get_request()
+            # BaseHTTPRequestHandler expects a (host, port) client address
+            return request, ('local', 0)
+
+    if address.startswith('unix:'):
+        path = address[len('unix:'):]
+        if os.path.exists(path):
+            os.remove(path)
+        server = ThreadingUnixHTTPServer(path, CollectorHandler)
+    else:
+        host, _, port = address.rpartition(':')
+        server = http.server.ThreadingHTTPServer((host, int(port)), CollectorHandler)
+    server.lock = threading.Lock()
+    with open(output_path, 'a') as output:
+        server.output = output
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Stand-in memoz telemetry collector.')
+    parser.add_argument('--serve', default='127.0.0.1:8125',
+                        help='host:port or unix:path to listen on')
+    parser.add_argument('--out', default='events.jsonl',
+                        help='file the events received are appended to')
+    args = parser.parse_args()
+    serve(args.serve, args.out)
@@ -0,0 +1,84 @@
+#! /usr/bin/env python3
+
+'''
+Procedural tile pictures for the memoz game. Instead of being loaded from
+resources/, the hidden, target and wrong tile pictures are drawn at any size
+from a Theme, a set of colours taken from config.py. Pictures are computed
+with NumPy on whole pixel arrays, turned into Surfaces with pygame.surfarray,
+and cached so that a given size of a given theme is only drawn once.
+This module needs NumPy. To use a theme, set TILE_THEME in config.py to one
+of the names of THEMES.
+date: October 2026
+'''
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from config import *
+
+# background: colour of every tile, ring: mark of target tiles,
+# cross: mark of wrong tiles
+Theme = namedtuple('Theme', 'background ring cross')
+
+THEMES = {
+    'classic': Theme(COLOR_BLUE_1, COLOR_YELLOW, COLOR_BLUE_2),
+    'dusk': Theme(COLOR_BLUE_2, COLOR_ORANGE, COLOR_BLUE_1),
+    'contrast': Theme(COLOR_BLACK, COLOR_YELLOW, COLOR_WHITE),
+    'meadow': Theme(COLOR_BLUE_1, COLOR_GREEN, COLOR_BLUE_2),
+}
+
+# shapes, relative to the side of a tile
+RING_OUTER = 0.39
+RING_INNER = 0.17
+CROSS_WIDTH = 0.2
+CROSS_MARGIN = 0.1
+
+
+@lru_cache(maxsize=64)
+def tile_images(side, theme='classic'):
+    '''
+    Return the (hidden, target, wrong) pictures, side pixels wide, of the
+    Theme named theme.
+    '''
+    colors = THEMES[theme]
+    # pixel centres, x along the first axis as surfarray expects
+    coords = np.arange(side, dtype=np.float32) + 0.5
+    x = coords[:, np.newaxis]
+    y = coords[np.newaxis, :]
+    centre = side / 2
+
+    # coverage of each pixel by the ring, with one pixel of antialiasing
+    radius = np.hypot(x - centre, y - centre)
+    ring = (np.clip(RING_OUTER*side - radius + 0.5, 0, 1) *
+            np.clip(radius - RING_INNER*side + 0.5, 0, 1))
+
+    # coverage by the cross, both diagonals clipped to a centred square
+    half_width = CROSS_WIDTH * side / 2
+    diagonal = np.abs(x - y) / np.sqrt(2)
+    antidiagonal = np.abs(x + y - side) / np.sqrt(2)
+    bars = np.clip(half_width - np.minimum(diagonal, antidiagonal) + 0.5, 0, 1)
+    low, high = CROSS_MARGIN * side, (1 - CROSS_MARGIN) * side
+    inside = (np.clip(np.minimum(x - low, high - x) + 0.5, 0, 1) *
+              np.clip(np.minimum(y - low, high - y) + 0.5, 0, 1))
+    cross = bars * inside
+
+    hidden = _paint(side, colors.background)
+    target = _paint(side, colors.background, colors.ring, ring)
+    wrong = _paint(side, colors.background, colors.cross, cross)
+    return hidden, target, wrong
+
+
+def _paint(side, background, color=None, coverage=None):
+    '''
+    Return a Surface filled with background on which color is blended with
+    the given per pixel coverage.
+    '''
+    pixels = np.empty((side, side, 3), dtype=np.float32)
+    pixels[...] = background
+    if color is not None:
+        pixels += coverage[..., np.newaxis] * (np.array(color, dtype=np.float32) -
+                                               np.array(background, dtype=np.float32))
+    return pygame.surfarray.make_surface(np.rint(pixels).astype(np.uint8))
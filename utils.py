@@ -6,13 +6,16 @@ logic.
 date: March 2020
 '''
 
+import logging
 import pygame
+import assets
 from config import *
-from copy import copy
 from collections.abc import MutableMapping
-from collections import namedtuple
+from collections import namedtuple, deque
 from abc import ABC, abstractmethod
 
+logger = logging.getLogger(__name__)
+
 
 class Stage(MutableMapping):
     '''
@@ -21,14 +24,23 @@ class Stage(MutableMapping):
     QUIT = 'quit'
     MAIN = 'main menu'
 
-    def __init__(self, size, fps):
+    def __init__(self, size, fps, display=0):
         '''
         A Stage needs a Scene as early as instanciation, therefore it expects
         keyword arguments to instanciate TextScene. 
-        '''
-        # pygame init
-        pygame.init()
-        self.screen = pygame.display.set_mode(size)
+        The window is opened on the screen numbered display if there is one.
+        '''
+        # only the subsystems the game uses are initialized, the mixer being
+        # optional as pygame.init() would have it
+        pygame.display.init()
+        pygame.font.init()
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            pass
+        if display >= pygame.display.get_num_displays():
+            display = 0
+        self.screen = pygame.display.set_mode(size, display=display)
         self._clock = pygame.time.Clock()
         self._fps = fps
 
@@ -36,6 +48,13 @@ class Stage(MutableMapping):
         self._scenes = {}
         self._target = self.MAIN
         self._active = True
+        self._inputs = []
+        self._observers = []
+        self._last_scene = None
+        self._entered = True
+        self._deferred = deque()
+        self._overlays = []         # names of the overlay Scenes pushed
+        self._snapshots = []        # picture of what is under each overlay
         type(self).INSTANCE = self
 
     def play(self):
@@ -44,18 +63,77 @@ class Stage(MutableMapping):
         played is changed.
         '''
         while self._active:
-            inputs = pygame.event.get()
-            scene_inputs = []
-            for an_input in inputs:
-                if an_input.type == pygame.QUIT:
-                    self._active = False
-                else:
-                    scene_inputs.append(an_input)
-            self.current_scene.update(scene_inputs)
-            pygame.display.update()
-            self._clock.tick(self._fps)
+            self.step()
         self.quit()
 
+    def step(self):
+        '''
+        Run a single frame: gather events, update the current Scene, refresh
+        the display and notify observers. The list handed to the Scene is
+        reused from one frame to the next so that it doesn't need to be
+        allocated every frame.
+        '''
+        for observer in self._observers:
+            observer.frame_begin(self)
+        scene_inputs = self._inputs
+        scene_inputs.clear()
+        for an_input in pygame.event.get():
+            if an_input.type == pygame.QUIT:
+                self._active = False
+            else:
+                scene_inputs.append(an_input)
+        # the player doesn't wait for work deferred at startup
+        if self._deferred and any(an_input.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN)
+                                  for an_input in scene_inputs):
+            self.run_deferred()
+        scene = self.current_scene
+        self._entered = scene is not self._last_scene
+        self._last_scene = scene
+        scene.update(scene_inputs)
+        pygame.display.update()
+        for observer in self._observers:
+            observer.frame_end(self)
+        if self._deferred:
+            self._deferred.popleft()()
+        self._clock.tick(self._fps)
+
+    def defer(self, task):
+        '''
+        Have task, a function without parameters, called after a frame has
+        been displayed. Deferred tasks are called one per frame, in the order
+        they were given, so that work not needed by the first frame doesn't
+        delay it.
+        '''
+        self._deferred.append(task)
+
+    def run_deferred(self):
+        '''
+        Call every deferred task now.
+        '''
+        while self._deferred:
+            self._deferred.popleft()()
+
+    @property
+    def pending(self):
+        '''
+        Number of deferred tasks not called yet.
+        '''
+        return len(self._deferred)
+
+    def add_observer(self, observer):
+        '''
+        Register an object that is notified at each frame. It is expected to
+        implement frame_begin(stage) and frame_end(stage), the latter being
+        called once the display has been updated.
+        '''
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        '''
+        Stop notifying observer at each frame.
+        '''
+        self._observers.remove(observer)
+
     def quit(self):
         '''
         This method is called when the Stage is no longer active and the program
@@ -72,6 +150,65 @@ class Stage(MutableMapping):
             self.target = target
         return link
 
+    def push(self, name, dim=0):
+        '''
+        Play the Scene name as an overlay over what is onscreen. The screen is
+        captured once, darkened by dim (from 0, unchanged, to 1, black), and
+        the overlay is expected to draw itself over that snapshot instead of
+        having the Scene underneath drawn again. Scenes under an overlay
+        aren't updated until it is popped.
+        '''
+        if name not in self:
+            self.run_deferred()
+            if name not in self:
+                raise KeyError('non existing scene')
+        snapshot = self.screen.copy()
+        if dim:
+            shade = round(255 * (1 - dim))
+            snapshot.fill((shade, shade, shade), special_flags=pygame.BLEND_RGB_MULT)
+        self._overlays.append(name)
+        self._snapshots.append(snapshot)
+        logger.debug('overlay %r pushed', name)
+
+    def pop(self):
+        '''
+        Stop playing the topmost overlay and return its name, the Scene under
+        it is played again.
+        '''
+        self._snapshots.pop()
+        name = self._overlays.pop()
+        logger.debug('overlay %r popped', name)
+        return name
+
+    @property
+    def overlay(self):
+        '''
+        Name of the topmost overlay, None when there is none.
+        '''
+        return self._overlays[-1] if self._overlays else None
+
+    @property
+    def snapshot(self):
+        '''
+        Picture of the screen taken when the topmost overlay was pushed.
+        '''
+        return self._snapshots[-1] if self._snapshots else None
+
+    @property
+    def active(self):
+        '''
+        False once the Stage has been asked to quit.
+        '''
+        return self._active
+
+    @property
+    def entered(self):
+        '''
+        True during the first frame a Scene is played after another Scene,
+        Scenes that only draw what changed need to draw everything then.
+        '''
+        return self._entered
+
     @property
     def main_menu(self):
         '''
@@ -82,24 +219,34 @@ class Stage(MutableMapping):
     @property
     def target(self):
         '''
-        Name of the Scene being played.
+        Name of the Scene being played, leaving it for another Scene leaves
+        the overlays pushed over it as well.
         '''
         return self._target
 
     @target.setter
     def target(self, value):
         if value == self.QUIT:
+            logger.info('quitting')
             self._active = False
             return
         elif value not in self:
-            raise KeyError('non existing scene')
+            # the Scene may be created by a deferred task
+            self.run_deferred()
+            if value not in self:
+                raise KeyError('non existing scene')
+        logger.debug('scene %r played', value)
+        self._overlays.clear()
+        self._snapshots.clear()
         self._target = value
 
     @property
     def current_scene(self):
         '''
-        Scene being played.
+        Scene being played, the topmost overlay if there is one.
         '''
+        if self._overlays:
+            return self._scenes[self._overlays[-1]]
         return self._scenes[self.target]
 
     # ----Implementation of MutableMapping interface
@@ -173,21 +320,36 @@ class Scene(ABC):
 
 class Button:
     '''
-    Graphic element that triggers an action when it's clicked.
+    Graphic element that triggers an action when it's clicked. A Button is in
+    one of three states, NORMAL, HOVER (the cursor is over it) or PRESSED, and
+    can have a picture for each of them.
     '''
-    def __init__(self, img, area, action):
+    NORMAL = 'normal'
+    HOVER = 'hover'
+    PRESSED = 'pressed'
+
+    def __init__(self, img, area, action, label=None, hover_img=None,
+                 pressed_img=None):
         '''
         Parameters expected:  
             img: a pygame Surface that will be displayed onscreen to represent the
                  button
-            pos: the coordinates (x, y) where the top-left corner of the button 
-                 will be set onscreen
             area: the area where a click will trigger the button's action
             action: the piece of code to execute when the button is clicked
-        '''
-        self._img = copy(img)
+            label: optional text describing the button
+            hover_img, pressed_img: optional Surfaces displayed when the cursor
+                 is over the button or when it is pressed, img is used by
+                 default
+        '''
+        self._imgs = {
+            self.NORMAL: img,
+            self.HOVER: img if hover_img is None else hover_img,
+            self.PRESSED: img if pressed_img is None else pressed_img,
+        }
         self._area = area
         self._action = action
+        self._label = label
+        self._state = self.NORMAL
 
     def click(self):
         '''
@@ -201,32 +363,153 @@ class Button:
 
     @property
     def img(self):
-        return self._img
+        '''
+        Picture of the Button in its current state.
+        '''
+        return self._imgs[self._state]
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        if value not in self._imgs:
+            raise ValueError('unknown button state')
+        self._state = value
 
     @classmethod
     def fromstring(cls, button_string, action, fontfile=None, size_px=16,
-                   font_color=COLOR_WHITE, bg_color=COLOR_BLACK, size=None):
+                   font_color=COLOR_WHITE, bg_color=COLOR_BLACK, size=None,
+                   hover_color=None, pressed_color=None):
         '''
         Create a Button from a string. This Button will just be the piece of text
-        button_string, written using font set to size_px.
+        button_string, written using font set to size_px. Its background is
+        hover_color when the cursor is over it and pressed_color when it is
+        pressed, by default these are lighter and darker shades of bg_color.
         '''
-        typeface = pygame.font.Font(fontfile, size_px)
+        typeface = assets.font(fontfile, size_px)
         font_surface = typeface.render(button_string, True, font_color)
         offset = (0, 0)
         if size is None:
-            img = pygame.Surface(font_surface.get_size())
+            size = font_surface.get_size()
         else:
-            img = pygame.Surface(size)
             offset = tuple((img_dim-ft_dim)//2 for ft_dim, img_dim in zip(font_surface.get_size(), size))
-        img.fill(bg_color)
-        img.blit(font_surface, offset)
-        area = img.get_size()
-        return cls(img, area, action)
+        if hover_color is None:
+            hover_color = pygame.Color(bg_color).lerp(COLOR_WHITE, 0.25)
+        if pressed_color is None:
+            pressed_color = pygame.Color(bg_color).lerp(COLOR_BLACK, 0.25)
+        imgs = []
+        for color in (bg_color, hover_color, pressed_color):
+            img = pygame.Surface(size)
+            img.fill(color)
+            img.blit(font_surface, offset)
+            imgs.append(img)
+        img, hover_img, pressed_img = imgs
+        return cls(img, size, action, label=button_string, hover_img=hover_img,
+                   pressed_img=pressed_img)
+
+
+class Camera:
+    '''
+    Viewport over a world that may be larger than the screen. The camera
+    knows which point of the world sits at the top-left corner of the screen
+    and how much the world is zoomed, and converts coordinates between the
+    world and the screen.
+    '''
+
+    def __init__(self, view_size, world_size, zoom=1, min_zoom=0.1, max_zoom=2):
+        self._view_size = view_size
+        self._world_size = world_size
+        self._min_zoom = min_zoom
+        self._max_zoom = max_zoom
+        self._zoom = min(max(zoom, min_zoom), max_zoom)
+        self._x = 0
+        self._y = 0
+        self._clamp()
+
+    @property
+    def zoom(self):
+        return self._zoom
+
+    @property
+    def pos(self):
+        '''
+        World coordinates of the top-left corner of the screen.
+        '''
+        return (self._x, self._y)
+
+    def to_world(self, screen_pos):
+        return (screen_pos[0] / self._zoom + self._x,
+                screen_pos[1] / self._zoom + self._y)
+
+    def to_screen(self, world_pos):
+        return (round((world_pos[0] - self._x) * self._zoom),
+                round((world_pos[1] - self._y) * self._zoom))
+
+    def visible_area(self):
+        '''
+        Return the (x, y, width, height) part of the world that is onscreen.
+        '''
+        return (self._x, self._y,
+                self._view_size[0] / self._zoom, self._view_size[1] / self._zoom)
+
+    def center_on(self, world_pos):
+        self._x = world_pos[0] - self._view_size[0] / self._zoom / 2
+        self._y = world_pos[1] - self._view_size[1] / self._zoom / 2
+        self._clamp()
+
+    def pan(self, dx, dy):
+        '''
+        Move the camera by (dx, dy) screen pixels.
+        '''
+        self._x += dx / self._zoom
+        self._y += dy / self._zoom
+        self._clamp()
+
+    def zoom_at(self, factor, screen_pos):
+        '''
+        Multiply the zoom by factor keeping the point of the world under
+        screen_pos where it is. Return True if the zoom changed.
+        '''
+        zoom = min(max(self._zoom * factor, self._min_zoom), self._max_zoom)
+        if zoom == self._zoom:
+            return False
+        x_world, y_world = self.to_world(screen_pos)
+        self._zoom = zoom
+        self._x = x_world - screen_pos[0] / zoom
+        self._y = y_world - screen_pos[1] / zoom
+        self._clamp()
+        return True
+
+    def _clamp(self):
+        '''
+        Keep the camera over the world, a world smaller than the screen is
+        centered.
+        '''
+        for axis in (0, 1):
+            view = self._view_size[axis] / self._zoom
+            world = self._world_size[axis]
+            if world <= view:
+                value = (world - view) / 2
+            else:
+                value = min(max((self._x, self._y)[axis], 0), world - view)
+            if axis == 0:
+                self._x = value
+            else:
+                self._y = value
 
 
 class Menu(Scene):
     '''
     Example of how to subclass Scene.
+    The background and the buttons of a Menu are flattened on a single
+    Surface. It is drawn entirely when the Menu starts being played, after
+    that only the buttons whose state changed are drawn again.
     '''
     FixedButton = namedtuple('FixedButton', 'zone button')
 
@@ -235,44 +518,65 @@ class Menu(Scene):
         super().__init__(stage, name)
 
         # custom things done by this particular class
-        # graphics
+        # graphics, converted for faster blitting
         if img == None:
-            self._img = pygame.Surface(stage.screen.get_size())
-            self._img.fill(COLOR_BLACK)
-
-        else:
-            self._img = copy(img)
-        self._widgets_img = pygame.Surface(stage.screen.get_size())
-        self._widgets_img.set_colorkey(COLOR_GREEN)
-        self._widgets_img.fill(COLOR_GREEN)
-
-        # convert images for faster blitting
-        self._img = self._img.convert()
-        self._widgets_img = self._widgets_img.convert()
+            img = pygame.Surface(stage.screen.get_size())
+            img.fill(COLOR_BLACK)
+        self._img = img.convert()
 
         self._buttons = list()
+        self._dirty = list()        # zones to draw again at next frame
 
     # Implementation of mandatory Scene methods
 
     def handle_inputs(self, inputs):
         for an_input in inputs:
-            if an_input.type == pygame.MOUSEBUTTONDOWN:
-                pos = pygame.mouse.get_pos()
+            if an_input.type == pygame.MOUSEMOTION:
                 for zone, button in self._buttons:
-                    if zone.collidepoint(*pos):
+                    if button.state != Button.PRESSED:
+                        self.set_button_state(zone, button, Button.HOVER
+                                              if zone.collidepoint(an_input.pos)
+                                              else Button.NORMAL)
+            elif an_input.type == pygame.MOUSEBUTTONUP:
+                for zone, button in self._buttons:
+                    if button.state == Button.PRESSED:
+                        self.set_button_state(zone, button, Button.HOVER
+                                              if zone.collidepoint(an_input.pos)
+                                              else Button.NORMAL)
+            elif an_input.type == pygame.MOUSEBUTTONDOWN:
+                for zone, button in self._buttons:
+                    if zone.collidepoint(an_input.pos):
+                        self.set_button_state(zone, button, Button.PRESSED)
                         button.click()
 
     def draw(self):
         '''
         Draw the Scene onscreen
         '''
-        self._stage.screen.blit(self._img, COORD_UP_LEFT)
-        self._stage.screen.blit(self._widgets_img, COORD_UP_LEFT)
+        screen = self._stage.screen
+        if self._stage.entered:
+            # a pressed button doesn't get released while another Scene is
+            # played
+            for zone, button in self._buttons:
+                if button.state == Button.PRESSED:
+                    self.set_button_state(zone, button, Button.NORMAL)
+            screen.blit(self._img, COORD_UP_LEFT)
+        else:
+            for zone in self._dirty:
+                screen.blit(self._img, zone, zone)
+        self._dirty.clear()
 
     @property
     def img(self):
         return self._img
 
+    @property
+    def buttons(self):
+        '''
+        Tuple of the (zone, button) pairs of this Menu.
+        '''
+        return tuple(self._buttons)
+
     # Added functionnality
 
     def add_button_at(self, button, pos):
@@ -283,7 +587,57 @@ class Menu(Scene):
             raise TypeError('Button instance expected')
         zone = pygame.Rect(pos, button.area)
         self._buttons.append(self.FixedButton(zone, button))
-        self._widgets_img.blit(button.img, pos)
+        self._img.blit(button.img, zone)
+
+    def set_button_state(self, zone, button, state):
+        '''
+        Change the state of a Button of this Menu and draw it again on the
+        flattened Surface if its picture changed.
+        '''
+        if button.state == state:
+            return
+        previous_img = button.img
+        button.state = state
+        if button.img is not previous_img:
+            self._img.blit(button.img, zone)
+            self._dirty.append(zone)
+
+
+class OverlayMenu(Menu):
+    '''
+    Menu played over another Scene, to be pushed with Stage.push. img, which
+    may be transparent, is drawn over the snapshot of the Scene underneath.
+    The whole picture is put together once, when the Menu is pushed, so that
+    playing it costs no more than playing a Menu.
+    '''
+
+    def __init__(self, stage, name, img=None):
+        super().__init__(stage, name)
+        if img is None:
+            img = pygame.Surface(stage.screen.get_size(), pygame.SRCALPHA)
+        self._panel = img.convert_alpha()
+
+    def draw(self):
+        if self._stage.entered:
+            self._compose()
+        super().draw()
+
+    def add_button_at(self, button, pos):
+        super().add_button_at(button, pos)
+        # buttons are part of the panel, so that they are drawn again with it
+        zone, button = self._buttons[-1]
+        self._panel.blit(button.img, zone)
+
+    def _compose(self):
+        '''
+        Draw the snapshot, the panel and the buttons in their current state
+        on the flattened Surface.
+        '''
+        self._img.blit(self._stage.snapshot, COORD_UP_LEFT)
+        self._img.blit(self._panel, COORD_UP_LEFT)
+        for zone, button in self._buttons:
+            if button.state != Button.NORMAL:
+                self._img.blit(button.img, zone)
 
 
 # DEMOS